@@ -1,3 +1,7 @@
+# UNMAINTAINED LEGACY COPY - don't run this one, use SSRsi-Coinbase.py.
+# This is the old standalone Coinbase bot from before the shared core in ssrsi/. It has its own copy of
+# the trader and none of the fixes since (paper order holds, journal, circuit breaker, rate limits...),
+# so it has drifted from what SSRsi-Coinbase.py does. Kept only for reference, will go away eventually.
 import ccxt
 import pandas as pd
 import time
@@ -494,6 +498,8 @@ def set_order_timeout(minutes):
 
 
 if __name__ == "__main__":
+    logging.warning("SSRsi-Coinbase-original-hardcoded-way.py is an unmaintained legacy copy, "
+                    "run SSRsi-Coinbase.py instead")
     if not os.path.exists('templates'):
         os.makedirs('templates')
     if not os.path.exists('templates/index-coinbase.html'):
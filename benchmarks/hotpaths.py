@@ -0,0 +1,279 @@
+"""Benchmarks for the trader's hot paths, offline against a stub exchange (benchmarks/stub.py)
+
+    python benchmarks/hotpaths.py --json before.json
+    (change something)
+    python benchmarks/hotpaths.py --json after.json --compare before.json
+
+--compare prints the change per benchmark and exits with status 1 when anything got slower than
+--threshold (25% by default), so it can gate a commit. Timings are the median of --repeat rounds.
+The 1 GB log for load_previous_trades is only generated with --log-sizes 10,100,1000; logs are
+written once to --workdir and reused after that.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub import StubExchange  # noqa: E402
+
+from ssrsi.dashboard import create_app  # noqa: E402
+from ssrsi.exchanges import KrakenAdapter  # noqa: E402
+from ssrsi.journal import TradeJournal  # noqa: E402
+from ssrsi.rsi import StreamingRSI  # noqa: E402
+from ssrsi.trader import RSITrader  # noqa: E402
+
+
+def timed(fn, repeat, number=1, setup=None):
+    """Median and min seconds per call of fn over `repeat` rounds of `number` calls"""
+    rounds = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number)
+    return {'seconds': statistics.median(rounds), 'min': min(rounds), 'rounds': repeat, 'calls': number}
+
+
+def make_trader(workdir, name, exchange=None, paper=True, **settings):
+    adapter = KrakenAdapter(exchange=exchange or StubExchange())
+    adapter.log_file = os.path.join(workdir, f"{name}.log")
+    settings.setdefault('candle_db', ':memory:')
+    settings.setdefault('trade_journal_dir', os.path.join(workdir, f"{name}-trades"))
+    return RSITrader(adapter, 'DOGE', paper_trading=paper, settings=settings)
+
+
+def bench_rsi(workdir, repeat):
+    results = {}
+    for period in (3, 14, 50, 200):
+        exchange = StubExchange(candles=1000)
+        trader = make_trader(workdir, f"rsi{period}", exchange, rsi_period=period)
+        trader.calculate_rsi()
+
+        # Startup: the whole cached tail (500 candles) folded into an empty engine
+        def cold():
+            trader.rsi_engine = StreamingRSI(period, trader.rsi_method)
+            trader.calculate_rsi(sync=False)
+        results[f"calculate_rsi/cold/period={period}"] = timed(cold, repeat, 20)
+
+        # Every cycle after that: one new candle to download, store and fold in
+        def warm():
+            exchange.advance(1)
+            trader.calculate_rsi()
+        results[f"calculate_rsi/new_candle/period={period}"] = timed(warm, repeat, 50)
+    return results
+
+
+LOG_NOISE = ("{time} - INFO - Price: 0.20512345, RSI: 47.31, USDT: 50.00, DOGE: 61.18663155\n"
+             "{time} - INFO - PAPER BALANCES: DOGE=61.18663155, USDT=50.00\n"
+             "{time} - INFO - 127.0.0.1 - - \"GET /update_data?cursor=1234&trades=17 HTTP/1.1\" 200 -\n")
+
+
+def synthetic_log(workdir, megabytes):
+    """A log like the bot writes: mostly price/RSI and request lines, a trade every ~100 lines"""
+    path = os.path.join(workdir, f"synthetic-{megabytes}mb.log")
+    if os.path.exists(path) and os.path.getsize(path) >= megabytes * 1024 * 1024:
+        return path
+
+    started = datetime(2023, 1, 1)
+    target = megabytes * 1024 * 1024
+    written = 0
+    i = 0
+    with open(path + '.tmp', 'w') as f:
+        while written < target:
+            chunk = []
+            for _ in range(1000):
+                stamp = (started + timedelta(seconds=20 * i)).strftime('%Y-%m-%d %H:%M:%S,000')
+                chunk.append(LOG_NOISE.format(time=stamp) * 11)
+                side = 'BUY' if i % 2 else 'SELL'
+                chunk.append(f"{stamp} - INFO - PAPER {side}: 61.18663155 DOGE at 0.20{i % 1000:03d} for 12.50 USDT\n")
+                i += 1
+            text = ''.join(chunk)
+            f.write(text)
+            written += len(text)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def bench_load_trades(workdir, repeat, sizes):
+    results = {}
+    for megabytes in sizes:
+        log = synthetic_log(workdir, megabytes)
+        trader = make_trader(workdir, f"load{megabytes}")
+        trader.log_file = log
+        journal_dir = trader.trade_journal_dir
+
+        def fresh_start():
+            trader.journal.close()
+            shutil.rmtree(journal_dir, ignore_errors=True)
+
+        def restart():
+            trader.journal.close()
+            trader.load_previous_trades()
+
+        # First start on a journal: the trades in the log get imported once
+        rounds = 1 if megabytes >= 1000 else repeat
+        results[f"load_previous_trades/import_log/{megabytes}MB"] = timed(trader.load_previous_trades, rounds,
+                                                                         setup=fresh_start)
+        # Every restart after that only reads the journal
+        results[f"load_previous_trades/restart/{megabytes}MB"] = timed(restart, repeat, 20)
+        results[f"load_previous_trades/restart/{megabytes}MB"]['trades'] = len(trader.journal)
+    return results
+
+
+def bench_paper_trades(workdir, repeat):
+    trader = make_trader(workdir, 'paper')
+    state = {'buy': True}
+
+    def trade():
+        side = 'buy' if state['buy'] else 'sell'
+        state['buy'] = not state['buy']
+        trader.execute_trade(side, 1000.0 if side == 'buy' else 5000.0)
+    return {'execute_trade/paper': timed(trade, repeat, 200)}
+
+
+def bench_last_buy(workdir, repeat):
+    """Finding the last buy on restart, when it is the very first of a long history of sells"""
+    results = {}
+    for count in (10_000, 1_000_000):
+        path = os.path.join(workdir, f"lastbuy-{count}.journal")
+        if not os.path.exists(path):
+            journal = TradeJournal(path)
+            trades = [(1_600_000_000 + i * 60, 'sell', 0.2, 10.0, 0.0, True) for i in range(count)]
+            trades[0] = (1_600_000_000, 'buy', 0.19, 10.0, 0.0, True)
+            journal.extend(trades)
+            journal.close()
+
+        def open_last_buy():
+            journal = TradeJournal(path)
+            journal.last('buy')
+            journal.close()
+        results[f"last_buy/indexed/{count}"] = timed(open_last_buy, repeat, 20)
+
+        # Index lost (crash between the journal and index writes): walks back to the buy
+        results[f"last_buy/rebuild_index/{count}"] = timed(
+            open_last_buy, repeat, setup=lambda: os.remove(path + '.idx'))
+    return results
+
+
+def bench_dashboard(workdir, repeat):
+    results = {}
+    for points in (100, 1000):
+        trader = make_trader(workdir, f"dash{points}")
+        trader.trading_enabled = False
+        trader.max_data_points = points
+        for i in range(points):
+            trader.check_signal(0.2 + i * 1e-5, 50.0)
+        for i in range(20):
+            trader.record_trade('buy' if i % 2 else 'sell', 0.2, 10.0)
+        client = create_app([trader], trader.adapter).test_client()
+
+        def render():
+            response = client.get('/')
+            assert response.status_code == 200
+        results[f"dashboard/render/points={points}"] = timed(render, repeat, 20)
+        results[f"dashboard/update_data/full/points={points}"] = timed(
+            lambda: client.get('/update_data?cursor=0'), repeat, 20)
+    return results
+
+
+SUITES = {
+    'rsi': lambda args: bench_rsi(args.workdir, args.repeat),
+    'load_trades': lambda args: bench_load_trades(args.workdir, args.repeat, args.log_sizes),
+    'paper_trade': lambda args: bench_paper_trades(args.workdir, args.repeat),
+    'last_buy': lambda args: bench_last_buy(args.workdir, args.repeat),
+    'dashboard': lambda args: bench_dashboard(args.workdir, args.repeat),
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline run. Returns the names that got slower than threshold."""
+    regressions = []
+    print(f"\n{'benchmark':<48} {'before':>10} {'after':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            print(f"{name:<48} {'-':>10} {format_seconds(result['seconds']):>10}      new")
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  SLOWER'
+        print(f"{name:<48} {format_seconds(before['seconds']):>10} {format_seconds(result['seconds']):>10} "
+              f"{change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trader's hot paths against a stub exchange")
+    parser.add_argument('--only', nargs='+', choices=sorted(SUITES), help="Run just these suites")
+    parser.add_argument('--repeat', type=int, default=5, help="Rounds per benchmark (the median is reported)")
+    parser.add_argument('--log-sizes', type=lambda s: [int(x) for x in s.split(',')], default=[10, 100],
+                        help="Synthetic log sizes in MB for load_previous_trades, e.g. 10,100,1000")
+    parser.add_argument('--workdir', help="Where synthetic logs and journals go (default: a temp dir, removed after)")
+    parser.add_argument('--json', help="Write the results to this file")
+    parser.add_argument('--compare', help="Results file of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    # The trader logs every paper trade and chart point, keep that out of the output
+    logging.disable(logging.CRITICAL)
+    keep_workdir = args.workdir is not None
+    args.workdir = args.workdir or tempfile.mkdtemp(prefix='ssrsi-bench-')
+    os.makedirs(args.workdir, exist_ok=True)
+
+    results = {}
+    try:
+        for name in args.only or SUITES:
+            suite_results = SUITES[name](args)
+            for bench, result in suite_results.items():
+                print(f"{bench:<48} {format_seconds(result['seconds']):>10}", flush=True)
+            results.update(suite_results)
+    finally:
+        if not keep_workdir:
+            shutil.rmtree(args.workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'commit': git_commit(), 'python': sys.version.split()[0], 'machine': platform.machine(),
+                       'time': datetime.now().isoformat(timespec='seconds'), 'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) more than {args.threshold:.0%} slower")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Startup time and memory of the live bot's imports, old (pandas) way vs the lean runtime
+
+Every profile is imported in a fresh interpreter so nothing is cached between them. The numbers are
+the wall time of the imports and the peak RSS of the process afterwards (median of --runs).
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    # What SSRsi-Kraken.py imported before the ssrsi package: pandas just for Timestamp/DataFrame
+    'legacy (pandas)': ['ccxt', 'pandas', 'flask'],
+    # What the exchange scripts import now
+    'lean': ['ssrsi.trader', 'ssrsi.dashboard', 'ssrsi.runner', 'ssrsi.exchanges', 'ssrsi.logs'],
+    # Lean plus the websocket feed (use_price_stream = True loads ccxt.pro/aiohttp)
+    'lean + streaming': ['ssrsi.trader', 'ssrsi.dashboard', 'ssrsi.runner', 'ssrsi.exchanges', 'ssrsi.logs',
+                         'ssrsi.feed'],
+    # Analysis tools, where numpy is fine
+    'backtest': ['ssrsi.backtest', 'ssrsi.sweep'],
+}
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+elapsed = time.perf_counter() - start
+heavy = [m for m in ('pandas', 'numpy', 'ccxt.pro', 'aiohttp') if m in sys.modules]
+print(json.dumps({'seconds': elapsed, 'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'heavy': heavy}))
+"""
+
+
+def measure(modules, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE] + modules, cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(json.loads(output))
+    return {
+        'seconds': statistics.median(s['seconds'] for s in samples),
+        'rss_mb': statistics.median(s['rss_mb'] for s in samples),
+        'heavy': samples[-1]['heavy'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare startup time and RSS of the runtime profiles")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per profile (median is reported)")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = {name: measure(modules, args.runs) for name, modules in PROFILES.items()}
+
+    print(f"{'profile':<18} {'import s':>9} {'RSS MB':>8}  heavy modules loaded")
+    for name, r in results.items():
+        print(f"{name:<18} {r['seconds']:>9.3f} {r['rss_mb']:>8.1f}  {', '.join(r['heavy']) or '-'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'runs': args.runs, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""A ccxt stand-in for benchmarks: deterministic candles and tickers, instant orders, no network"""
+import random
+
+
+class StubExchange:
+    """Just the parts of a ccxt client the trader uses.
+
+    Candles are a seeded random walk, one every `interval_ms`, ending at the current candle.
+    advance() moves time forward so the next sync finds new candles, like a live exchange would.
+    """
+
+    id = 'kraken'
+    rateLimit = 0
+    has = {'fetchTickers': True, 'fetchOpenOrders': True, 'fetchClosedOrders': True}
+
+    def __init__(self, candles=1000, interval_ms=300_000, seed=42, start_ms=1_700_000_000_000):
+        self.interval_ms = interval_ms
+        self.start_ms = start_ms
+        self._random = random.Random(seed)
+        self._closes = []
+        self._order_seq = 0
+        self.calls = 0
+        self.advance(candles)
+
+    def advance(self, candles=1):
+        price = self._closes[-1] if self._closes else 0.2
+        for _ in range(candles):
+            price = max(price * (1 + self._random.gauss(0, 0.004)), 1e-6)
+            self._closes.append(price)
+
+    def _row(self, index):
+        close = self._closes[index]
+        return [self.start_ms + index * self.interval_ms, close, close * 1.002, close * 0.998, close, 1000.0]
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        self.calls += 1
+        first = 0
+        if since is not None:
+            first = max(0, -(-(since - self.start_ms) // self.interval_ms))
+        rows = [self._row(i) for i in range(first, len(self._closes))]
+        if limit:
+            rows = rows[:limit] if since is not None else rows[-limit:]
+        return rows
+
+    def fetch_ticker(self, symbol):
+        self.calls += 1
+        return {'symbol': symbol, 'last': self._closes[-1]}
+
+    def fetch_tickers(self, symbols=None):
+        self.calls += 1
+        return {s: {'symbol': s, 'last': self._closes[-1]} for s in symbols or []}
+
+    def fetch_balance(self):
+        self.calls += 1
+        return {'free': {'USDT': 1000.0, 'DOGE': 5000.0, 'XDG': 5000.0}}
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.calls += 1
+        self._order_seq += 1
+        return {'id': f"stub-{self._order_seq}", 'symbol': symbol, 'side': side, 'amount': amount,
+                'price': price, 'status': 'open', 'filled': 0.0}
+
+    def cancel_order(self, order_id, symbol=None):
+        self.calls += 1
+        return {'id': order_id, 'status': 'canceled'}
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None):
+        self.calls += 1
+        return []
+
+    def fetch_closed_orders(self, symbol=None, since=None, limit=None):
+        self.calls += 1
+        return []
+
+    def load_markets(self):
+        return {}
+
+    def market(self, symbol):
+        return {'symbol': symbol}
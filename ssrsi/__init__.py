@@ -0,0 +1 @@
+"""Shared building blocks for the Super Simple RSI trading scripts"""
@@ -0,0 +1,267 @@
+"""asyncio version of the trade loop, built on ccxt.async_support
+
+MultiSymbolRunner makes its calls one after another: balance, order checks, tickers, then OHLCV for
+every symbol. Here the independent fetches of a cycle go out together on one event loop, so a cycle
+takes about as long as its slowest call instead of the sum of all of them. The trading rules stay
+in RSITrader (check_signal / plan_trade), only the network side is async.
+"""
+import asyncio
+import logging
+import time
+
+from ssrsi import metrics
+from ssrsi.scheduler import DueTracker, scheduler_for
+
+
+class AsyncTradeEngine:
+    """Drives N traders from one event loop on one async ccxt client.
+
+    Per cycle, concurrently:
+      * tickers for every symbol (one fetch_tickers call where supported)
+      * new candles for every symbol
+      * the private calls (balance, then order statuses). These run in order inside their own
+        task: Kraken rejects requests whose nonces arrive out of order, and they are only a
+        couple of calls anyway. Per-order status checks only overlap on venues whose adapter
+        sets parallel_private.
+    Then each trader decides on the fresh data, and real orders are placed on the async client.
+    Cycles are aligned to candle closes like MultiSymbolRunner's, unless cycle_seconds is given.
+    """
+
+    def __init__(self, adapter, traders, cycle_seconds=None, client=None):
+        self.adapter = adapter
+        self.traders = list(traders)
+        self.cycle_seconds = cycle_seconds
+        self.client = client
+        self.last_cycle_seconds = None
+        self._unified = {}
+        self._loop = None
+        self._stop = None
+
+    def unified_symbol(self, symbol):
+        if symbol not in self._unified:
+            try:
+                self._unified[symbol] = self.client.market(symbol)['symbol']
+            except Exception:
+                return symbol
+        return self._unified[symbol]
+
+    async def fetch_prices(self, traders):
+        """{trader symbol: last price} for the traders without a fresh streamed price"""
+        wanted = [t.symbol for t in traders if not (t.price_feed and t.price_feed.price() is not None)]
+        if not wanted:
+            return {}
+        if len(wanted) > 1 and self.client.has.get('fetchTickers'):
+            tickers = await self.client.fetch_tickers([self.unified_symbol(s) for s in wanted])
+        else:
+            fetched = await asyncio.gather(*(self.client.fetch_ticker(s) for s in wanted))
+            tickers = {self.unified_symbol(s): ticker for s, ticker in zip(wanted, fetched)}
+
+        prices = {}
+        for symbol in wanted:
+            ticker = tickers.get(self.unified_symbol(symbol))
+            if ticker and ticker.get('last') is not None:
+                prices[symbol] = float(ticker['last'])
+        return prices
+
+    async def fetch_private(self, traders, balance=True):
+        """Balance plus the status of every trader's resting orders: (balance, {symbol: {order_id: order}})"""
+        live = [t for t in traders if not t.paper_trading]
+        if not live:
+            return None, {}
+        balance = await self.client.fetch_balance() if balance else None
+        statuses = {}
+        for trader in live:
+            if trader.active_orders:
+                since = int(min(o['time'] for o in trader.active_orders.values()).timestamp() * 1000)
+                statuses[trader.symbol] = await self.fetch_order_statuses(list(trader.active_orders), trader.symbol, since)
+        return balance, statuses
+
+    async def fetch_order_statuses(self, order_ids, symbol, since=None):
+        """ExchangeAdapter.fetch_order_statuses on the async client, same steps (order_status_steps)"""
+        steps = self.adapter.order_status_steps(order_ids, symbol, since)
+        results = None
+        try:
+            while True:
+                calls = steps.send(results)
+                # Several calls in one step only where the adapter allows concurrent private calls
+                results = await asyncio.gather(*(getattr(self.client, method)(*args) for method, args in calls),
+                                               return_exceptions=True)
+        except StopIteration as done:
+            return done.value
+
+    async def sync_candles(self, trader):
+        if trader.candles.needs_sync or not (trader.price_feed and trader.price_feed.candles_fresh()):
+            await trader.candles.sync_async(self.client)
+
+    async def run_cycle(self, traders=None):
+        """Returns the traders that couldn't get a price or RSI this time"""
+        traders = self.traders if traders is None else traders
+        started = time.perf_counter()
+        prices, private, *candle_results = await asyncio.gather(
+            self.fetch_prices(traders), self.fetch_private(traders), *(self.sync_candles(t) for t in traders),
+            return_exceptions=True)
+
+        if isinstance(prices, Exception):
+            logging.warning(f"Ticker fetch failed: {prices}")
+            prices = {}
+        if isinstance(private, Exception):
+            logging.error(f"Balance update failed: {private}")
+            private = (None, {})
+        balance, statuses = private
+        for trader, result in zip(traders, candle_results):
+            if isinstance(result, Exception):
+                logging.error(f"Candle sync for {trader.display_symbol} failed: {result}")
+
+        failed = []
+        for trader in traders:
+            with metrics.cycle_seconds.time(trader.display_symbol):
+                try:
+                    if trader.symbol in prices:
+                        trader.snapshot.put('price', prices[trader.symbol])
+                    if balance is not None:
+                        trader.snapshot.put('balance', balance)
+                    ok, placed = await self.trader_cycle(trader, statuses.get(trader.symbol, {}))
+                    if not ok:
+                        failed.append(trader)
+                    if placed:
+                        # They all spend the same USDT, so the next trader needs the new balance
+                        balance = await self.client.fetch_balance()
+                except Exception as e:
+                    logging.error(f"Trade cycle error ({trader.display_symbol}): {e}")
+                    failed.append(trader)
+        for trader in failed:
+            metrics.cycle_failures.inc(trader.display_symbol)
+
+        self.last_cycle_seconds = time.perf_counter() - started
+        return failed
+
+    async def trader_cycle(self, trader, order_statuses):
+        """The trader's run_cycle with every network call done on the async client.
+
+        Returns (got price and RSI, placed a real order).
+        """
+        # Snapshot reads only: the balance and price were fetched above on the async client, falling
+        # back to the trader's sync client here would block the event loop
+        trader.update_balances(reconcile=False, fetch=False)
+        trader.apply_order_statuses(order_statuses)
+
+        price = trader.price_feed.price() if trader.price_feed else None
+        if price is None:
+            price = trader.snapshot.get('price')
+        rsi = trader.calculate_rsi(sync=False)
+        if trader.paper_trading:
+            trader.match_paper_orders(price)
+        await self.cancel_stale_orders(trader)
+        ok = bool(price) and rsi is not None
+        signal = trader.check_signal(price, rsi)
+        if not signal:
+            return ok, False
+
+        plan = trader.plan_trade(*signal, current_price=price)
+        if plan is None:
+            return ok, False
+        if trader.paper_trading:
+            trader.place_paper_order(plan)
+            return ok, False
+
+        logging.info(f"Attempting REAL {plan['side'].upper()}: {plan['quantity']:.8f} {trader.display_symbol} "
+                     f"at limit price {plan['price']:.5f}")
+        try:
+            order = await self.client.create_order(trader.symbol, 'limit', plan['side'], plan['quantity'], plan['price'])
+        except Exception as e:
+            trader.order_failed(plan, e)
+            return ok, False
+        trader.order_placed(plan, order)
+        return ok, True
+
+    async def cancel_stale_orders(self, trader):
+        if trader.paper_trading:
+            trader.check_and_cancel_stale_orders()
+            return
+        for order_id in trader.stale_orders():
+            try:
+                await self.client.cancel_order(order_id, trader.symbol)
+                trader.order_cancelled(order_id)
+            except Exception as e:
+                logging.error(f"Failed to cancel order {order_id}: {e}")
+
+    async def run_checks(self):
+        """Between candles: only resting order statuses and stale order cancels"""
+        traders = [t for t in self.traders if t.active_orders]
+        if not traders:
+            return
+        try:
+            _, statuses = await self.fetch_private(traders, balance=False)
+        except Exception as e:
+            logging.warning(f"Could not check order statuses: {e}")
+            return
+        for trader in traders:
+            if trader.paper_trading:
+                trader.match_paper_orders(trader.snapshot.get('price'))
+            trader.apply_order_statuses(statuses.get(trader.symbol, {}))
+            await self.cancel_stale_orders(trader)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self.client is None:
+            self.client = self.adapter.create_async_client()
+
+        symbols = ', '.join(t.display_symbol for t in self.traders)
+        logging.info(f"Async engine running {len(self.traders)} trader(s) on {self.adapter.display_name}: {symbols}")
+        try:
+            try:
+                await self.client.load_markets()
+            except Exception as e:
+                logging.warning(f"Could not load markets: {e}")
+
+            if self.cycle_seconds:
+                await self.run_fixed_cadence()
+            else:
+                await self.run_aligned()
+        finally:
+            await self.client.close()
+            logging.info("Async engine stopped")
+
+    async def run_fixed_cadence(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            await self.guarded(self.run_cycle())
+            wait = max(self.cycle_seconds - (time.monotonic() - started), 1)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_aligned(self):
+        scheduler = scheduler_for(self.traders)
+        due = DueTracker(scheduler)
+        failed = await self.guarded(self.run_cycle(due.due(self.traders)), self.traders)
+        scheduler.cycle_done(failed)
+        while True:
+            kind = await scheduler.wait_async(self._stop)
+            if kind is None:
+                return
+            if kind == 'check':
+                await self.guarded(self.run_checks())
+                continue
+
+            traders = due.due(self.traders) if kind == 'candle' else failed
+            failed = await self.guarded(self.run_cycle(traders), traders) if traders else []
+            scheduler.cycle_done(failed)
+
+    async def guarded(self, step, on_error=None):
+        try:
+            return await step
+        except Exception as e:
+            logging.error(f"Async cycle error: {e}")
+            return on_error
+
+    def run_forever(self):
+        """Blocking entry point, e.g. for a thread next to Flask"""
+        asyncio.run(self.run())
+
+    def stop(self):
+        """Ask the loop to finish the current cycle and close the client. Safe to call from any thread."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
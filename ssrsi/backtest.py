@@ -0,0 +1,349 @@
+"""Vectorized backtester that replays RSITrader's trade_cycle/execute_trade rules over candle history.
+
+    python -m ssrsi.backtest --db candles.sqlite --exchange kraken --symbol DOGE/USDT --interval 5m
+    python -m ssrsi.backtest --csv doge_5m.csv --rsi-low 30 --rsi-high 80
+"""
+import argparse
+import bisect
+import csv
+import sqlite3
+import time
+
+import numpy as np
+
+from ssrsi.paperfills import PaperBook
+
+FILL_DTYPE = np.dtype([
+    ('index', np.int64), ('timestamp', np.int64), ('side', 'U4'), ('price', np.float64),
+    ('quantity', np.float64), ('fee', np.float64), ('usdt', np.float64), ('crypto', np.float64),
+])
+
+
+class StrategyParams:
+    """The RSITrader settings the backtest cares about, defaults match the scripts' config section"""
+
+    FIELDS = ('rsi_period', 'rsi_low', 'rsi_high', 'rsi_method', 'position_percentage', 'price_adjustment',
+              'min_usdt_trade', 'min_crypto_trade', 'maker_fee', 'taker_fee', 'order_timeout_minutes')
+
+    def __init__(self, **overrides):
+        self.rsi_period = 3
+        self.rsi_low = 25
+        self.rsi_high = 85
+        self.rsi_method = 'sma'
+        self.position_percentage = 97
+        self.price_adjustment = 0.004
+        self.min_usdt_trade = 5.0
+        self.min_crypto_trade = 15
+        self.maker_fee = 0.0016
+        self.taker_fee = 0.0026
+        self.order_timeout_minutes = 30
+        for name, value in overrides.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Unknown strategy parameter '{name}'")
+            setattr(self, name, value)
+
+    @classmethod
+    def from_trader(cls, trader):
+        return cls(**{name: getattr(trader, name) for name in cls.FIELDS if hasattr(trader, name)})
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class BacktestResult:
+    def __init__(self, params, timestamps, closes, fills, equity, total_fees, initial_equity, expired=0):
+        self.params = params
+        self.timestamps = timestamps
+        self.closes = closes
+        self.fills = fills  # structured array, FILL_DTYPE
+        self.equity = equity  # USDT value of the account at every candle close
+        self.total_fees = total_fees
+        self.initial_equity = initial_equity
+        self.expired = expired  # Orders that never filled and were cancelled after order_timeout_minutes
+
+    def summary(self):
+        final = float(self.equity[-1]) if len(self.equity) else self.initial_equity
+        peak = np.maximum.accumulate(self.equity) if len(self.equity) else np.array([final])
+        drawdown = float(np.max((peak - self.equity) / np.where(peak > 0, peak, 1.0))) if len(self.equity) else 0.0
+        return {
+            'candles': int(len(self.closes)),
+            'buys': int(np.count_nonzero(self.fills['side'] == 'buy')),
+            'sells': int(np.count_nonzero(self.fills['side'] == 'sell')),
+            'expired_orders': self.expired,
+            'final_equity': final,
+            'return_percent': (final / self.initial_equity - 1) * 100 if self.initial_equity else 0.0,
+            'max_drawdown_percent': drawdown * 100,
+            'total_fees': self.total_fees,
+        }
+
+
+def rsi_series(closes, period, method='sma'):
+    """RSI at every close (NaN while warming up), same maths as ssrsi.rsi.StreamingRSI"""
+    closes = np.asarray(closes, dtype=np.float64)
+    rsi = np.full(len(closes), np.nan)
+    if len(closes) <= period:
+        return rsi
+
+    delta = np.diff(closes)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+
+    if method == 'sma':
+        gain_cs = np.concatenate(([0.0], np.cumsum(gains)))
+        loss_cs = np.concatenate(([0.0], np.cumsum(losses)))
+        avg_gain = (gain_cs[period:] - gain_cs[:-period]) / period
+        avg_loss = (loss_cs[period:] - loss_cs[:-period]) / period
+        # Cumulative sums leave tiny negative residue on flat stretches
+        avg_gain = np.maximum(avg_gain, 0.0)
+        avg_loss = np.maximum(avg_loss, 0.0)
+    elif method == 'wilder':
+        # Recursive smoothing doesn't vectorize cleanly, a plain loop over floats is still fast
+        avg_gain = np.empty(len(gains) - period + 1)
+        avg_loss = np.empty_like(avg_gain)
+        g = gains[:period].mean()
+        l = losses[:period].mean()
+        avg_gain[0], avg_loss[0] = g, l
+        keep = (period - 1) / period
+        for i, (gain, loss) in enumerate(zip(gains[period:].tolist(), losses[period:].tolist()), 1):
+            g = g * keep + gain / period
+            l = l * keep + loss / period
+            avg_gain[i], avg_loss[i] = g, l
+    else:
+        raise ValueError(f"Unknown RSI method '{method}'")
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi[period:] = np.where(avg_loss == 0, 100.0, values)
+    return rsi
+
+
+def run_backtest(candles, params=None, initial_usdt=50.0, initial_crypto=0.0, last_buy_price=None, rsi=None,
+                 fill_model='book'):
+    """Replay the live rules over ccxt-style candles ([ts, open, high, low, close, volume] rows).
+
+    Signals are computed for every candle at once, only candles with a signal (or a resting order)
+    are walked in Python because balances and the last-buy price carry over from one trade to the next.
+    fill_model='book' rests each order in a PaperBook like paper mode does: it fills on a later candle
+    that trades through the limit, with the maker fee, or expires after order_timeout_minutes.
+    fill_model='instant' fills every order at its limit price on the signal candle with the taker fee,
+    the optimistic case.
+    """
+    if fill_model not in ('book', 'instant'):
+        raise ValueError(f"Unknown fill model '{fill_model}'")
+    params = params or StrategyParams()
+    candles = np.asarray(candles, dtype=np.float64)
+    timestamps = candles[:, 0].astype(np.int64)
+    closes = candles[:, 4]
+    if rsi is None:
+        rsi = rsi_series(closes, params.rsi_period, params.rsi_method)
+
+    with np.errstate(invalid='ignore'):
+        buy_signal = rsi < params.rsi_low
+        sell_signal = rsi > params.rsi_high
+    candidates = np.flatnonzero(buy_signal | sell_signal)
+    buy_prices = closes * (1 - params.price_adjustment)
+    sell_prices = closes * (1 + params.price_adjustment)
+
+    usdt = float(initial_usdt)
+    crypto = float(initial_crypto)
+    held_usdt = held_crypto = 0.0
+    position = params.position_percentage / 100
+    fee_rate = params.taker_fee
+    profit_factor = 1 + params.taker_fee * 2
+    total_fees = 0.0
+    expired = 0
+    fills = []
+
+    def plan(i):
+        """(side, quantity, price) for the signal on candle i, None when execute_trade would skip it"""
+        if buy_signal[i]:
+            if usdt < params.min_usdt_trade:
+                return None
+            spend = usdt * position
+            if spend * (1 + fee_rate) > usdt:
+                spend = usdt / (1 + fee_rate)
+            if spend < params.min_usdt_trade:
+                return None
+            return 'buy', spend / buy_prices[i], buy_prices[i]
+
+        if crypto < params.min_crypto_trade:
+            return None
+        quantity = crypto * position
+        if quantity < params.min_crypto_trade:
+            return None
+        price = sell_prices[i]
+        # Same profit buffer execute_trade applies against the last buy
+        if last_buy_price is not None and price <= last_buy_price * profit_factor:
+            return None
+        return 'sell', quantity, price
+
+    if fill_model == 'instant':
+        for i in candidates.tolist():
+            order = plan(i)
+            if order is None:
+                continue
+            side, quantity, price = order
+            fee = quantity * price * fee_rate
+            if side == 'buy':
+                usdt -= quantity * price + fee
+                crypto += quantity
+                last_buy_price = price
+            else:
+                usdt += quantity * price - fee
+                crypto -= quantity
+            total_fees += fee
+            fills.append((i, timestamps[i], side, price, quantity, fee, usdt, crypto))
+    else:
+        book = PaperBook(params.maker_fee, params.taker_fee)
+        interval = int(timestamps[1] - timestamps[0]) if len(timestamps) > 1 else 0
+        timeout_ms = params.order_timeout_minutes * 60_000
+        # Plain lists: indexing numpy arrays one element at a time is the slow part of this loop
+        starts, highs, lows = timestamps.tolist(), candles[:, 2].tolist(), candles[:, 3].tolist()
+        is_candidate = (buy_signal | sell_signal).tolist()
+        signal_at = candidates.tolist()
+        n = len(closes)
+        i = signal_at[0] if signal_at else n
+
+        # One pass per candle close, in run_cycle's order: match, cancel stale orders, maybe place one.
+        # Candles where nothing rests and nothing signals are jumped over.
+        while i < n:
+            ts = starts[i]
+            close_ms = ts + interval
+            if book:
+                for fill in book.match(ts, highs[i], lows[i]):
+                    order = fill.order
+                    if order.side == 'buy':
+                        held_usdt -= order.quantity * order.price
+                        usdt -= fill.fee
+                        crypto += order.quantity
+                        last_buy_price = fill.price
+                    else:
+                        held_crypto -= order.quantity
+                        usdt += order.quantity * fill.price - fill.fee
+                    total_fees += fill.fee
+                    fills.append((i, ts, order.side, fill.price, order.quantity, fill.fee,
+                                  usdt + held_usdt, crypto + held_crypto))
+                for order in book.expire(close_ms - timeout_ms):
+                    if order.side == 'buy':
+                        held_usdt -= order.quantity * order.price
+                        usdt += order.quantity * order.price
+                    else:
+                        held_crypto -= order.quantity
+                        crypto += order.quantity
+                    expired += 1
+
+            if is_candidate[i]:
+                planned = plan(i)
+                if planned is not None:
+                    side, quantity, price = planned
+                    # Buys rest under the close and sells over it, so this never crosses the market
+                    book.place(side, quantity, price, close_ms)
+                    if side == 'buy':
+                        usdt -= quantity * price
+                        held_usdt += quantity * price
+                    else:
+                        crypto -= quantity
+                        held_crypto += quantity
+
+            if book:
+                i += 1
+            else:
+                k = bisect.bisect_right(signal_at, i)
+                i = signal_at[k] if k < len(signal_at) else n
+
+    fills = np.array(fills, dtype=FILL_DTYPE)
+
+    # Balances (free plus on hold) only change at fills: look up the latest fill at or before every candle
+    usdt_path = np.concatenate(([initial_usdt], fills['usdt']))
+    crypto_path = np.concatenate(([initial_crypto], fills['crypto']))
+    step = np.searchsorted(fills['index'], np.arange(len(closes)), side='right')
+    equity = usdt_path[step] + crypto_path[step] * closes
+
+    initial_equity = initial_usdt + initial_crypto * (closes[0] if len(closes) else 0.0)
+    return BacktestResult(params, timestamps, closes, fills, equity, total_fees, initial_equity, expired)
+
+
+def load_csv(path):
+    """timestamp(ms),open,high,low,close,volume per line, a header line is skipped"""
+    rows = []
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            try:
+                rows.append([float(v) for v in row[:6]])
+            except ValueError:
+                continue
+    return np.array(rows, dtype=np.float64)
+
+
+def load_cache(path, exchange_id, symbol, interval):
+    """Read straight from a CandleCache database (see ssrsi.candles)"""
+    with sqlite3.connect(path) as db:
+        rows = db.execute("SELECT ts, open, high, low, close, volume FROM candles "
+                          "WHERE exchange = ? AND symbol = ? AND interval = ? ORDER BY ts",
+                          (exchange_id, symbol, interval)).fetchall()
+    return np.array(rows, dtype=np.float64).reshape(-1, 6)
+
+
+def add_strategy_arguments(parser):
+    defaults = StrategyParams()
+    parser.add_argument('--rsi-period', type=int, default=defaults.rsi_period)
+    parser.add_argument('--rsi-low', type=float, default=defaults.rsi_low)
+    parser.add_argument('--rsi-high', type=float, default=defaults.rsi_high)
+    parser.add_argument('--rsi-method', choices=('sma', 'wilder'), default=defaults.rsi_method)
+    parser.add_argument('--position-percentage', type=float, default=defaults.position_percentage)
+    parser.add_argument('--price-adjustment', type=float, default=defaults.price_adjustment)
+    parser.add_argument('--min-usdt-trade', type=float, default=defaults.min_usdt_trade)
+    parser.add_argument('--min-crypto-trade', type=float, default=defaults.min_crypto_trade)
+    parser.add_argument('--maker-fee', type=float, default=defaults.maker_fee)
+    parser.add_argument('--taker-fee', type=float, default=defaults.taker_fee)
+    parser.add_argument('--order-timeout-minutes', type=float, default=defaults.order_timeout_minutes)
+
+
+def add_data_arguments(parser):
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='CSV file of candles')
+    source.add_argument('--db', help='candles.sqlite written by the bot')
+    parser.add_argument('--exchange', default='kraken')
+    parser.add_argument('--symbol', default='DOGE/USDT')
+    parser.add_argument('--interval', default='5m')
+    parser.add_argument('--usdt', type=float, default=50.0, help='Starting USDT balance')
+    parser.add_argument('--crypto', type=float, default=0.0, help='Starting crypto balance')
+
+
+def load_candles(args):
+    if args.csv:
+        return load_csv(args.csv)
+    return load_cache(args.db, args.exchange, args.symbol, args.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the RSI strategy on stored candles')
+    add_data_arguments(parser)
+    add_strategy_arguments(parser)
+    parser.add_argument('--fills', action='store_true', help='Print every fill')
+    parser.add_argument('--fill-model', choices=('book', 'instant'), default='book',
+                        help='book = orders rest until a later candle trades through them (like paper mode), '
+                             'instant = fill on the signal candle')
+    args = parser.parse_args()
+
+    candles = load_candles(args)
+    if len(candles) == 0:
+        parser.error('no candles found')
+
+    params = StrategyParams(**{name: getattr(args, name) for name in StrategyParams.FIELDS if hasattr(args, name)})
+    started = time.perf_counter()
+    result = run_backtest(candles, params, args.usdt, args.crypto, fill_model=args.fill_model)
+    elapsed = time.perf_counter() - started
+
+    if args.fills:
+        for fill in result.fills:
+            when = time.strftime('%Y-%m-%d %H:%M', time.gmtime(fill['timestamp'] / 1000))
+            print(f"{when}  {fill['side'].upper():4}  {fill['quantity']:.8f} @ {fill['price']:.8f}  "
+                  f"fee {fill['fee']:.4f}  USDT {fill['usdt']:.2f}  crypto {fill['crypto']:.8f}")
+    for key, value in result.summary().items():
+        print(f"{key:>22}: {value:.4f}" if isinstance(value, float) else f"{key:>22}: {value}")
+    print(f"{'runtime_seconds':>22}: {elapsed:.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Local OHLCV cache so each cycle only downloads candles it hasn't seen yet"""
+import logging
+import sqlite3
+import threading
+from collections import deque
+
+import ccxt
+
+
+class CandleCache:
+    """SQLite-backed candle store keyed by (exchange, symbol, interval).
+
+    Candles are kept as ccxt-style rows: [timestamp_ms, open, high, low, close, volume].
+    The newest `tail_size` rows are also held in memory so the RSI code never touches disk.
+    """
+
+    # Missing candles that count as a gap for the RSI (an outage), rather than a quiet market:
+    # Coinbase leaves out candles without trades
+    GAP_CANDLES = 12
+
+    def __init__(self, path, exchange_id, symbol, interval, tail_size=500):
+        self.path = path
+        self.exchange_id = exchange_id
+        self.symbol = symbol
+        self.interval = interval
+        self.interval_ms = ccxt.Exchange.parse_timeframe(interval) * 1000
+        self.tail = deque(maxlen=tail_size)
+        self.needs_sync = True  # Set until a REST sync has run, and again whenever merged candles leave a gap
+
+        self._lock = threading.Lock()
+        self._key = (exchange_id, symbol, interval)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS candles (
+                exchange TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (exchange, symbol, interval, ts)
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+        self._load_tail()
+
+    def _load_tail(self):
+        rows = self._db.execute(
+            "SELECT ts, open, high, low, close, volume FROM candles "
+            "WHERE exchange = ? AND symbol = ? AND interval = ? ORDER BY ts DESC LIMIT ?",
+            (*self._key, self.tail.maxlen)).fetchall()
+        self.tail.extend(list(row) for row in reversed(rows))
+        if rows:
+            logging.info(f"Loaded {len(rows)} cached {self.symbol} {self.interval} candles from {self.path}")
+
+    def last_timestamp(self):
+        return self.tail[-1][0] if self.tail else None
+
+    def sync(self, exchange, warmup=100, page_limit=720, max_pages=10):
+        """Fetch candles newer than the last stored one and merge them in. Returns the fetched rows."""
+        pages = self._pages(warmup, page_limit, max_pages)
+        request = next(pages)
+        try:
+            while True:
+                request = pages.send(exchange.fetch_ohlcv(self.symbol, self.interval, **request))
+        except StopIteration as done:
+            return self._synced(done.value)
+
+    async def sync_async(self, exchange, warmup=100, page_limit=720, max_pages=10):
+        """sync() for a ccxt.async_support client"""
+        pages = self._pages(warmup, page_limit, max_pages)
+        request = next(pages)
+        try:
+            while True:
+                request = pages.send(await exchange.fetch_ohlcv(self.symbol, self.interval, **request))
+        except StopIteration as done:
+            return self._synced(done.value)
+
+    def _pages(self, warmup, page_limit, max_pages):
+        """The paging for sync/sync_async: yields fetch_ohlcv kwargs, gets each page sent back
+        and returns everything fetched. Keeps the sync and async versions from drifting apart."""
+        last_ts = self.last_timestamp()
+        if last_ts is None:
+            return (yield {'limit': warmup})
+
+        # Start one candle back: the last stored candle was probably still open when we saved it
+        since = last_ts - self.interval_ms
+        fetched = []
+        for _ in range(max_pages):
+            page = yield {'since': since, 'limit': page_limit}
+            fetched.extend(page)
+            if len(page) < page_limit or page[-1][0] <= since:
+                break
+            since = page[-1][0]
+        return fetched
+
+    def _synced(self, fetched):
+        self.merge(fetched)
+        self.needs_sync = False
+        return fetched
+
+    def merge(self, candles):
+        """Upsert candles (oldest first) into the DB and the in-memory tail"""
+        if not candles:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(*self._key, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in candles])
+            self._db.commit()
+
+            for candle in sorted(candles, key=lambda c: c[0]):
+                candle = list(candle)
+                if not self.tail or candle[0] > self.tail[-1][0]:
+                    if self.tail and candle[0] > self.tail[-1][0] + self.interval_ms:
+                        self.needs_sync = True
+                    self.tail.append(candle)
+                elif candle[0] == self.tail[-1][0]:
+                    self.tail[-1] = candle
+                else:
+                    # Older than the newest we hold, patch it in place if it's in the tail
+                    for i in range(len(self.tail) - 1, -1, -1):
+                        if self.tail[i][0] == candle[0]:
+                            self.tail[i] = candle
+                            break
+                        if self.tail[i][0] < candle[0]:
+                            break
+
+    def has_gap(self, rows, after=None):
+        """True if rows (oldest first, following the candle at `after`) skip more than GAP_CANDLES candles"""
+        limit = self.interval_ms * (self.GAP_CANDLES + 1)
+        previous = after
+        for candle in rows:
+            if previous is not None and candle[0] - previous > limit:
+                return True
+            previous = candle[0]
+        return False
+
+    def contiguous_tail(self):
+        """Tail candles after the last gap in it, oldest first (all of them when there is none)"""
+        limit = self.interval_ms * (self.GAP_CANDLES + 1)
+        with self._lock:
+            rows = list(self.tail)
+        for i in range(len(rows) - 1, 0, -1):
+            if rows[i][0] - rows[i - 1][0] > limit:
+                return rows[i:]
+        return rows
+
+    def since(self, timestamp, limit=None):
+        """Tail candles with ts >= timestamp (all of the tail when timestamp is None), oldest first"""
+        with self._lock:
+            if timestamp is None:
+                rows = list(self.tail)
+            else:
+                rows = []
+                for candle in reversed(self.tail):
+                    if candle[0] < timestamp:
+                        break
+                    rows.append(candle)
+                rows.reverse()
+        return rows[-limit:] if limit else rows
+
+    def window(self, count):
+        """Last `count` candles, oldest first"""
+        with self._lock:
+            return list(self.tail)[-count:]
+
+    def history(self, start=None, end=None):
+        """All stored candles between start and end (ms, inclusive), oldest first"""
+        query = ("SELECT ts, open, high, low, close, volume FROM candles "
+                 "WHERE exchange = ? AND symbol = ? AND interval = ?")
+        params = list(self._key)
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND ts <= ?"
+            params.append(end)
+        with self._lock:
+            return [list(row) for row in self._db.execute(query + " ORDER BY ts", params)]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,195 @@
+"""Flask dashboard for one or more traders on the same exchange"""
+import logging
+import os
+import time
+
+from flask import Flask, Response, render_template, jsonify, request, abort, g
+
+from ssrsi import metrics, profiler, ratelimit
+from ssrsi.logs import log_stats
+
+CHART_POINTS = 500  # Most points per chart sent to the browser, ?points= overrides it
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+
+def format_recent_trades(trader, count=10):
+    formatted_trades = []
+    for trade in trader.trades.recent(count):
+        formatted_trades.append({
+            'time': trade.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            'type': trade.side.upper(),
+            'price': f"{trade.price:.8f}",
+            'class': 'positive' if trade.side == 'buy' else 'negative'
+        })
+    return formatted_trades[::-1]
+
+
+def create_app(traders, adapter):
+    """traders: list of RSITrader, the first one is what / shows"""
+    app = Flask(__name__, template_folder=TEMPLATE_DIR)
+    app.static_folder = 'static'
+
+    # Exchange calls made while serving a page queue behind the trade loop's
+    @app.before_request
+    def dashboard_priority():
+        g.rate_priority = ratelimit.set_priority(ratelimit.DASHBOARD)
+
+    @app.teardown_request
+    def reset_dashboard_priority(exc):
+        token = g.pop('rate_priority', None)
+        if token is not None:
+            ratelimit.reset_priority(token)
+
+    by_symbol = {t.display_symbol.upper(): t for t in traders}
+    default_trader = traders[0]
+
+    def get_trader(symbol=None):
+        """Trader for a dashboard request, ?symbol= or /symbol/<SYMBOL>, defaulting to the first one"""
+        symbol = symbol or request.args.get('symbol')
+        if not symbol:
+            return default_trader
+        if symbol.upper() not in by_symbol:
+            abort(404)
+        return by_symbol[symbol.upper()]
+
+    def selected_traders():
+        # ?symbol=DOGE for one trader, otherwise all of them
+        return [get_trader()] if request.args.get('symbol') else list(by_symbol.values())
+
+    @app.route('/')
+    @app.route('/symbol/<symbol>')
+    def dashboard(symbol=None):
+        trader = get_trader(symbol)
+        pnl_usdt, pnl_percent = trader.calculate_pnl()
+        chart_points = request.args.get('points', default=CHART_POINTS, type=int)
+        points, data_cursor, _ = trader.chart_points_since(0, chart_points)
+        logging.debug(f"Dashboard {trader.display_symbol}: pnl_usdt={pnl_usdt}, pnl_percent={pnl_percent}")
+
+        return render_template(adapter.template,
+                               exchange_name=adapter.display_name,
+                               trading_data=format_recent_trades(trader),
+                               last_usdt_balance=f"{trader.current_usdt_balance:.2f}",
+                               last_crypto_balance=f"{trader.current_crypto_balance:.2f}",
+                               prices=points['prices'],
+                               rsi_values=points['rsi_values'],
+                               timestamps=points['timestamps'],
+                               last_updated=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(points['timestamps'][-1]))
+                               if points['timestamps'] else 'N/A',
+                               trading_enabled=trader.trading_enabled,
+                               pnl_usdt=pnl_usdt,
+                               pnl_percent=pnl_percent,
+                               total_fees=f"{trader.total_fees_paid:.4f}",
+                               crypto_symbol=trader.display_symbol,
+                               chart_points=chart_points,
+                               chart_level=points['level'],
+                               chart_partial=points['partial'],
+                               data_cursor=data_cursor,
+                               trade_cursor=trader.trades.count,
+                               symbols=list(by_symbol),
+                               exchange_status=adapter.resilience.status()
+                               )
+
+    @app.route('/update_data')
+    def update_data():
+        """Only what changed since the client's cursors, everything else comes from cached state"""
+        trader = get_trader()
+        points, cursor, reset = trader.chart_points_since(request.args.get('cursor', default=0, type=int),
+                                                          request.args.get('points', default=CHART_POINTS, type=int),
+                                                          request.args.get('level', default=0, type=int))
+        pnl_usdt, pnl_percent = trader.calculate_pnl()
+
+        data = {
+            'cursor': cursor,
+            'reset': reset,
+            **points,
+            'last_usdt_balance': f"{trader.current_usdt_balance:.2f}",
+            'last_crypto_balance': f"{trader.current_crypto_balance:.2f}",
+            'pnl_usdt': pnl_usdt,
+            'pnl_percent': pnl_percent,
+            'total_fees': f"{trader.total_fees_paid:.4f}",
+            'trading_enabled': trader.trading_enabled,
+            'trade_cursor': trader.trades.count,
+            'exchange_status': adapter.resilience.status(),
+        }
+        if request.args.get('trades', default=-1, type=int) != trader.trades.count:
+            data['trading_data'] = format_recent_trades(trader)
+        return jsonify(data)
+
+    @app.route('/snapshot_stats')
+    def snapshot_stats():
+        return jsonify({symbol: t.snapshot.stats() for symbol, t in by_symbol.items()})
+
+    @app.route('/resilience')
+    def resilience_stats():
+        return jsonify(adapter.resilience.stats())
+
+    @app.route('/rate_limit')
+    def rate_limit_stats():
+        return jsonify(adapter.limiter.stats())
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        # Everything here is already in memory, a scrape costs no exchange calls
+        breakers = list(adapter.resilience.breakers.values())
+        queues = adapter.limiter.stats()['classes']
+        gauges = [
+            ('ssrsi_circuit_open', "1 while the endpoint's circuit breaker is open",
+             [({'endpoint': b.name}, int(b.state == 'open')) for b in breakers]),
+            ('ssrsi_rate_limit_queued', "Calls waiting for the rate limiter, per priority class",
+             [({'class': name}, c['queued']) for name, c in queues.items()]),
+            ('ssrsi_log_records_dropped', "Log records dropped because the log queue was full",
+             [({}, log_stats().get('dropped', 0))]),
+            ('ssrsi_active_orders', "Resting orders per trader",
+             [({'symbol': symbol}, len(t.active_orders)) for symbol, t in by_symbol.items()]),
+        ]
+        return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/admin/profile')
+    def profile_status():
+        run = profiler.current()
+        return jsonify(run.status() if run else {'running': False})
+
+    @app.route('/admin/profile/start')
+    def profile_start():
+        """?seconds=30&interval_ms=10&threads=all (default: the trade loop and the request threads)"""
+        seconds = min(request.args.get('seconds', default=30, type=float), profiler.MAX_SECONDS)
+        interval = request.args.get('interval_ms', default=10, type=float) / 1000
+        scope = None if request.args.get('threads') == 'all' else profiler.DEFAULT_SCOPE
+        return jsonify(profiler.start(seconds, interval, scope).status())
+
+    @app.route('/admin/profile/stop')
+    def profile_stop():
+        run = profiler.stop()
+        return jsonify(run.status() if run else {'running': False})
+
+    @app.route('/admin/profile/download')
+    def profile_download():
+        """?format=collapsed (flame graphs, the default) or pstats"""
+        run = profiler.current()
+        if run is None:
+            abort(404)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(run.started))
+        if request.args.get('format') == 'pstats':
+            return Response(run.pstats_data(), mimetype='application/octet-stream',
+                            headers={'Content-Disposition': f'attachment; filename=ssrsi-{stamp}.pstats'})
+        return Response(run.collapsed(), mimetype='text/plain',
+                        headers={'Content-Disposition': f'attachment; filename=ssrsi-{stamp}.collapsed.txt'})
+
+    @app.route('/log_stats')
+    def logging_stats():
+        return jsonify(log_stats())
+
+    @app.route('/enable_trading/<int:enable>')
+    def enable_trading(enable):
+        for t in selected_traders():
+            t.trading_enabled = bool(enable)
+        return jsonify({'status': 'success', 'trading_enabled': bool(enable)})
+
+    @app.route('/set_order_timeout/<int:minutes>')
+    def set_order_timeout(minutes):
+        for t in selected_traders():
+            t.set_order_timeout(minutes)
+        return jsonify({'status': 'success', 'order_timeout_minutes': minutes})
+
+    return app
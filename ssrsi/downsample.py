@@ -0,0 +1,127 @@
+"""Coarser copies of the chart series, the dashboard keeps weeks of points and sends a few hundred
+
+Level k sums up a bucket of raw points as the samples holding the lowest and highest price and the
+lowest and highest RSI, in the order they happened: at most four points, often two because the RSI
+extremes tend to sit on the price ones. They are real samples (timestamp, price and RSI as they were
+recorded), so spikes survive (an RSI dip that triggered a buy stays on the chart) and both charts keep
+one time axis. Unlike LTTB, which picks points per series from the whole window, every level is kept
+up to date as points arrive: a few comparisons per level per point, no pass over the window.
+Completed buckets go into a ChartSeries per level. The bucket still filling is served as `partial`
+points the browser replaces on its next poll.
+"""
+from collections import deque
+
+from ssrsi.series import ChartSeries, FIELDS
+
+BUCKET_POINTS = 4  # Most points a bucket turns into
+
+
+class _Bucket:
+    __slots__ = ('count', 'price_lo', 'price_hi', 'rsi_lo', 'rsi_hi')
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, index, timestamp, price, rsi):
+        # (value, index, sample) per extreme, the index orders the samples in time
+        if self.count == 0:
+            sample = (timestamp, price, rsi)
+            self.price_lo = self.price_hi = (price, index, sample)
+            self.rsi_lo = self.rsi_hi = (rsi, index, sample)
+        else:
+            if price < self.price_lo[0]:
+                self.price_lo = (price, index, (timestamp, price, rsi))
+            elif price > self.price_hi[0]:
+                self.price_hi = (price, index, (timestamp, price, rsi))
+            if rsi < self.rsi_lo[0]:
+                self.rsi_lo = (rsi, index, (timestamp, price, rsi))
+            elif rsi > self.rsi_hi[0]:
+                self.rsi_hi = (rsi, index, (timestamp, price, rsi))
+        self.count += 1
+
+    def points(self):
+        """The bucket's extreme samples as (timestamp, price, rsi) points, oldest first"""
+        if self.count == 0:
+            return []
+        extremes = (self.price_lo, self.price_hi, self.rsi_lo, self.rsi_hi)
+        samples = {index: sample for _, index, sample in extremes}
+        return [samples[index] for index in sorted(samples)]
+
+
+class _Level:
+    """One level: completed buckets in a ChartSeries sized for the worst case (BUCKET_POINTS each),
+    and how many points each of the last `buckets` buckets gave, since most give fewer. Only those
+    buckets are served, so the level covers the same stretch of time as the raw window."""
+    __slots__ = ('size', 'series', 'bucket', 'counts', 'points')
+
+    def __init__(self, size, buckets):
+        self.size = size
+        self.series = ChartSeries(BUCKET_POINTS * buckets)
+        self.bucket = _Bucket()
+        self.counts = deque(maxlen=buckets)
+        self.points = 0  # Points in the last `buckets` buckets
+
+    def close_bucket(self):
+        points = self.bucket.points()
+        for point in points:
+            self.series.append(*point)
+        if len(self.counts) == self.counts.maxlen:
+            self.points -= self.counts[0]
+        self.counts.append(len(points))
+        self.points += len(points)
+        self.bucket.count = 0
+
+
+class MinMaxLevels:
+    def __init__(self, capacity, factor=2, smallest=200):
+        """Levels of factor**k points per bucket, until one fits the window in `smallest` points.
+
+        Levels that could hold as many points as the raw window are skipped, they'd save nothing.
+        """
+        self.capacity = capacity
+        self.factor = factor
+        self.levels = []
+        self._index = 0
+        size, points = 1, capacity
+        while points > smallest:
+            size *= factor
+            # Completed buckets plus the filling one cover the raw window, give or take a bucket
+            buckets = max(1, capacity // size)
+            points = BUCKET_POINTS * buckets
+            if points < capacity:
+                self.levels.append(_Level(size, buckets))
+
+    def append(self, timestamp, price, rsi):
+        index = self._index
+        self._index += 1
+        for level in self.levels:
+            level.bucket.add(index, timestamp, price, rsi)
+            if level.bucket.count == level.size:
+                level.close_bucket()
+
+    def extend(self, views):
+        """Feed the points of ChartSeries views ({field: memoryview}), e.g. to rebuild after a resize"""
+        for point in zip(*(views[name].tolist() for name in FIELDS)):
+            self.append(*point)
+
+    def pick(self, points, max_points):
+        """Level to serve a window of `points` raw points in at most max_points (0 = raw)"""
+        if points <= max_points or not self.levels:
+            return 0
+        for level, entry in enumerate(self.levels, 1):
+            if BUCKET_POINTS * -(-points // entry.size) <= max_points:
+                return level
+        return len(self.levels)
+
+    def since(self, level, cursor):
+        """Like ChartSeries.since for a level (1 = the finest), plus the filling bucket's points"""
+        entry = self.levels[level - 1]
+        views, cursor, reset = entry.series.since(cursor)
+        if reset:
+            views = entry.series.last(entry.points)
+        return views, cursor, reset, entry.bucket.points()
+
+    def window(self, level):
+        """Points a level's chart holds right now, filling bucket included (changes as buckets close)"""
+        entry = self.levels[level - 1]
+        return entry.points + len(entry.bucket.points())
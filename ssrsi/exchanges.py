@@ -0,0 +1,191 @@
+"""Exchange adapters: everything that differs between Kraken and Coinbase lives here"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import ccxt
+
+from ssrsi import metrics, ratelimit, resilience
+from ssrsi.ratelimit import PriorityRateLimiter
+from ssrsi.resilience import Resilience
+
+
+class ExchangeAdapter:
+    """Owns the ccxt client plus the venue quirks: symbol format, balance codes, fees, capabilities.
+
+    The trader core only talks to the adapter, so adding an exchange means adding a subclass
+    here rather than another copy of the whole script.
+    """
+
+    name = None  # ccxt exchange id
+    display_name = None
+    log_file = 'rsi_trading.log'
+    template = 'index.html'
+    port = 5000
+
+    quote = 'USDT'
+    pair_separator = '/'
+    pairs = {}  # Symbols whose exchange pair isn't simply BASE<sep>QUOTE
+    balance_codes = {}  # Symbols the exchange reports balances under a different code
+
+    maker_fee = 0.0016
+    taker_fee = 0.0026
+
+    max_parallel_requests = 4  # Upper bound for fan-out when there is no batch endpoint
+    parallel_private = True  # The venue takes signed requests concurrently (no strictly increasing nonce)
+    rate_limit_burst = 1  # Requests (in ccxt cost units) that may go out back to back after a quiet spell
+
+    def __init__(self, api_key=None, secret=None, exchange=None, config=None):
+        self._credentials = (api_key, secret, config)
+        self.exchange = exchange or self.create_client(api_key, secret, config)
+
+        # One budget for every request to this exchange, orders first and dashboard last.
+        # Also makes the sync client's throttling safe for parallel order checks.
+        self.limiter = PriorityRateLimiter(getattr(self.exchange, 'rateLimit', 0), self.rate_limit_burst)
+        # Retries with backoff and a circuit breaker per endpoint, shared by both clients too
+        self.resilience = Resilience()
+        if hasattr(self.exchange, 'fetch2'):
+            ratelimit.install(self.exchange, self.limiter)
+            resilience.install(self.exchange, self.resilience)
+            metrics.install(self.exchange, self.name)
+
+    def client_options(self, api_key, secret, config=None):
+        options = {
+            'apiKey': api_key,
+            'secret': secret,
+            'enableRateLimit': True,
+        }
+        options.update(config or {})
+        return options
+
+    def create_client(self, api_key, secret, config=None):
+        return getattr(ccxt, self.name)(self.client_options(api_key, secret, config))
+
+    def create_async_client(self):
+        """A ccxt.async_support client with the same keys, for the asyncio engine (close it when done)"""
+        import ccxt.async_support as ccxt_async
+
+        client = getattr(ccxt_async, self.name)(self.client_options(*self._credentials))
+        # Same limiter as the sync client, so both together stay inside the exchange's limit
+        ratelimit.install(client, self.limiter)
+        resilience.install(client, self.resilience)
+        return metrics.install(client, self.name)
+
+    def market_symbol(self, symbol):
+        symbol = symbol.upper()
+        return self.pairs.get(symbol, f"{symbol}{self.pair_separator}{self.quote}")
+
+    def balance_code(self, symbol):
+        symbol = symbol.upper()
+        return self.balance_codes.get(symbol, symbol)
+
+    def supports(self, capability):
+        """ccxt 'has' flag (e.g. 'fetchTickers', 'fetchOpenOrders'), or 'streaming' for ccxt.pro support"""
+        if capability == 'streaming':
+            try:
+                import ccxt.pro as ccxtpro
+            except ImportError:
+                return False
+            return hasattr(ccxtpro, self.name)
+        return bool(self.exchange.has.get(capability))
+
+    def fetch_order_statuses(self, order_ids, symbol, since=None):
+        """Current state of several orders on one pair, as {order_id: ccxt order}.
+
+        Uses one fetch_open_orders call (plus one fetch_closed_orders for whatever isn't open
+        anymore) where the exchange has them, so the cost doesn't grow with the number of
+        orders. Anything still unaccounted for is fetched one by one: in parallel where the
+        venue takes concurrent signed requests (parallel_private), one after another otherwise.
+        """
+        steps = self.order_status_steps(order_ids, symbol, since)
+        results = None
+        try:
+            while True:
+                results = self._call_all(steps.send(results))
+        except StopIteration as done:
+            return done.value
+
+    def order_status_steps(self, order_ids, symbol, since=None):
+        """The calls behind fetch_order_statuses, for the sync and the async client alike.
+
+        Yields lists of (method, args) to run together and gets their results sent back, an
+        exception in place of a call that failed. Returns {order_id: ccxt order}.
+        """
+        order_ids = list(order_ids)
+        found = {}
+        if not order_ids:
+            return found
+
+        if self.supports('fetchOpenOrders'):
+            (orders,) = yield [('fetch_open_orders', (symbol,))]
+            if not isinstance(orders, Exception):
+                found.update((o['id'], o) for o in orders if o['id'] in order_ids)
+                if len(found) < len(order_ids) and self.supports('fetchClosedOrders'):
+                    (orders,) = yield [('fetch_closed_orders', (symbol, since))]
+                    if not isinstance(orders, Exception):
+                        found.update((o['id'], o) for o in orders if o['id'] in order_ids and o['id'] not in found)
+            if isinstance(orders, Exception):
+                logging.warning(f"Batched order status fetch failed, checking orders one by one: {orders}")
+
+        missing = [i for i in order_ids if i not in found]
+        groups = [missing] if self.parallel_private else [[order_id] for order_id in missing]
+        for group in groups:
+            if not group:
+                continue
+            orders = yield [('fetch_order', (order_id, symbol)) for order_id in group]
+            for order_id, order in zip(group, orders):
+                if isinstance(order, Exception):
+                    logging.warning(f"Could not check status of order {order_id}: {order}")
+                else:
+                    found[order_id] = order
+        return found
+
+    def _call_all(self, calls):
+        """Run (method, args) calls on the sync client, concurrently when there are several"""
+        def call(entry):
+            method, args = entry
+            try:
+                return getattr(self.exchange, method)(*args)
+            except Exception as e:
+                return e
+
+        if len(calls) == 1:
+            return [call(calls[0])]
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel_requests, len(calls))) as pool:
+            return list(pool.map(call, calls))
+
+
+class KrakenAdapter(ExchangeAdapter):
+    name = 'kraken'
+    display_name = 'Kraken'
+    log_file = 'rsi_trading-kraken.log'
+    port = 5000
+
+    # Each private call carries a nonce that has to be higher than the last one Kraken saw
+    parallel_private = False
+
+    maker_fee = 0.0016  # 0.16%
+    taker_fee = 0.0026  # 0.26%
+
+
+class CoinbaseAdapter(ExchangeAdapter):
+    name = 'coinbase'
+    display_name = 'Coinbase'
+    log_file = 'rsi_trading-coinbase.log'
+    port = 5010
+
+    # Coinbase uses 'BASE-QUOTE' product ids
+    pair_separator = '-'
+
+    # Kraken's fees as a placeholder, adjust for your Coinbase USDT tier
+    maker_fee = 0.0016
+    taker_fee = 0.0026
+
+
+ADAPTERS = {adapter.name: adapter for adapter in (KrakenAdapter, CoinbaseAdapter)}
+
+
+def get_adapter(name, *args, **kwargs):
+    try:
+        return ADAPTERS[name.lower()](*args, **kwargs)
+    except KeyError:
+        raise ValueError(f"Unsupported exchange '{name}', choose from: {', '.join(ADAPTERS)}") from None
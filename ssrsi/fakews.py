@@ -0,0 +1,171 @@
+"""Local fake websocket server speaking enough of Kraken's public v1 feed for StreamingPriceFeed.
+
+Run it and point the trader at it (price_stream_url = 'ws://127.0.0.1:8765'):
+
+    python -m ssrsi.fakews --port 8765 --symbol DOGE/USDT --price 0.2
+
+or check the feed end to end without touching the network:
+
+    python -m ssrsi.fakews --demo
+
+tests/test_fakews.py runs StreamingPriceFeed against it on an ephemeral port.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from aiohttp import web, WSMsgType
+
+# Kraken interval (minutes) -> ccxt timeframe
+INTERVALS = {1: '1m', 5: '5m', 15: '15m', 30: '30m', 60: '1h', 240: '4h', 1440: '1d'}
+
+
+def fake_markets(symbols):
+    """Minimal ccxt market structures so ccxt.pro doesn't have to load markets over REST"""
+    markets = {}
+    for symbol in symbols:
+        base, quote = symbol.split('/')
+        markets[symbol] = {
+            'id': base + quote, 'symbol': symbol, 'base': base, 'quote': quote,
+            'baseId': base, 'quoteId': quote, 'type': 'spot', 'spot': True, 'active': True,
+            'darkpool': False, 'precision': {'amount': 8, 'price': 8}, 'limits': {},
+            'info': {'wsname': symbol, 'altname': base + quote},
+        }
+    return markets
+
+
+class FakeKrakenFeed:
+    """Random-walk price pushed as Kraken 'ticker' and 'ohlc-N' channel messages"""
+
+    def __init__(self, price=0.2, volatility=0.001, tick_seconds=0.2, seed=None):
+        self.price = price
+        self.volatility = volatility
+        self.tick_seconds = tick_seconds
+        self.random = random.Random(seed)
+        self.clients = set()
+        self.candles = {}  # (pair, interval) -> [open_time, o, h, l, c, v]
+        self._channel_id = 100
+
+    def step(self):
+        self.price *= 1 + self.random.gauss(0, self.volatility)
+        return self.price
+
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({'connectionID': 1, 'event': 'systemStatus',
+                                      'status': 'online', 'version': '1.9.0'}))
+        subscriptions = []
+        self.clients.add(ws)
+        pusher = asyncio.ensure_future(self._push(ws, subscriptions))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                request_msg = json.loads(msg.data)
+                if request_msg.get('event') == 'ping':
+                    await ws.send_str(json.dumps({'event': 'pong', 'reqid': request_msg.get('reqid')}))
+                elif request_msg.get('event') == 'subscribe':
+                    await self._subscribe(ws, request_msg, subscriptions)
+        finally:
+            pusher.cancel()
+            self.clients.discard(ws)
+        return ws
+
+    async def _subscribe(self, ws, request_msg, subscriptions):
+        subscription = request_msg.get('subscription', {})
+        name = subscription.get('name')
+        for pair in request_msg.get('pair', []):
+            self._channel_id += 1
+            channel_name = name if name != 'ohlc' else f"ohlc-{subscription.get('interval', 1)}"
+            subscriptions.append((self._channel_id, channel_name, pair, subscription))
+            await ws.send_str(json.dumps({
+                'channelID': self._channel_id, 'channelName': channel_name, 'event': 'subscriptionStatus',
+                'reqid': request_msg.get('reqid'), 'pair': pair, 'status': 'subscribed',
+                'subscription': subscription,
+            }))
+
+    async def _push(self, ws, subscriptions):
+        while not ws.closed:
+            await asyncio.sleep(self.tick_seconds)
+            price = self.step()
+            now = time.time()
+            for channel_id, channel_name, pair, subscription in list(subscriptions):
+                if channel_name == 'ticker':
+                    payload = {
+                        'a': [f"{price * 1.0005:.8f}", 1, '1.0'], 'b': [f"{price * 0.9995:.8f}", 1, '1.0'],
+                        'c': [f"{price:.8f}", '1.0'], 'h': [f"{price:.8f}"] * 2, 'l': [f"{price:.8f}"] * 2,
+                        'o': [f"{price:.8f}"] * 2, 'p': [f"{price:.8f}"] * 2, 't': [1, 1], 'v': ['1.0', '1.0'],
+                    }
+                else:
+                    payload = self._candle(pair, int(subscription.get('interval', 1)), price, now)
+                await ws.send_str(json.dumps([channel_id, payload, channel_name, pair]))
+
+    def _candle(self, pair, interval, price, now):
+        seconds = interval * 60
+        open_time = now - now % seconds
+        candle = self.candles.get((pair, interval))
+        if candle is None or candle[0] != open_time:
+            candle = [open_time, price, price, price, price, 0.0]
+            self.candles[(pair, interval)] = candle
+        candle[2] = max(candle[2], price)
+        candle[3] = min(candle[3], price)
+        candle[4] = price
+        candle[5] += 1.0
+        return [f"{now:.6f}", f"{open_time + seconds:.6f}", f"{candle[1]:.8f}", f"{candle[2]:.8f}",
+                f"{candle[3]:.8f}", f"{candle[4]:.8f}", f"{candle[4]:.8f}", f"{candle[5]:.8f}", int(candle[5])]
+
+    def app(self):
+        application = web.Application()
+        application.router.add_get('/', self.handler)
+        return application
+
+
+async def _serve(feed, host, port):
+    runner = web.AppRunner(feed.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def _demo(port):
+    """Start the fake server and read prices through StreamingPriceFeed for a few seconds"""
+    import threading
+    from ssrsi.feed import StreamingPriceFeed
+
+    loop = asyncio.new_event_loop()
+    feed = FakeKrakenFeed(tick_seconds=0.05, seed=1)
+    runner = loop.run_until_complete(_serve(feed, '127.0.0.1', port))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    received = []
+    stream = StreamingPriceFeed('kraken', 'DOGE/USDT', '5m', ws_url=f"ws://127.0.0.1:{port}",
+                                markets=fake_markets(['DOGE/USDT']), on_candles=received.extend)
+    stream.start()
+    time.sleep(3)
+    print(f"price={stream.price()} ticks={stream.ticks} candle_updates={len(received)} errors={stream.errors}")
+    stream.stop()
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake Kraken public websocket feed')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--price', type=float, default=0.2)
+    parser.add_argument('--tick', type=float, default=0.2, help='Seconds between pushed updates')
+    parser.add_argument('--demo', action='store_true', help='Run a short end-to-end check and exit')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.demo:
+        _demo(args.port)
+    else:
+        main_loop = asyncio.new_event_loop()
+        main_loop.run_until_complete(_serve(FakeKrakenFeed(args.price, tick_seconds=args.tick), args.host, args.port))
+        logging.info(f"Fake Kraken feed on ws://{args.host}:{args.port}")
+        main_loop.run_forever()
@@ -0,0 +1,140 @@
+"""Push-based market data: a websocket subscriber that keeps the latest price in memory"""
+import asyncio
+import logging
+import threading
+import time
+
+import ccxt.pro as ccxtpro
+
+
+class StreamingPriceFeed:
+    """Runs ccxt.pro watch_ticker / watch_ohlcv in a background thread.
+
+    fetch_current_price() reads `price()` instead of waiting on a REST round trip, and
+    falls back to polling whenever the stream is down or the last tick is too old.
+    """
+
+    def __init__(self, exchange_id, symbol, interval=None, max_age=30.0, ws_url=None, markets=None,
+                 on_candles=None, config=None):
+        self.exchange_id = exchange_id
+        self.symbol = symbol
+        self.interval = interval
+        self.max_age = max_age
+        self.ws_url = ws_url
+        self.markets = markets
+        self.on_candles = on_candles  # Called with [[ts, o, h, l, c, v], ...] from the feed thread
+        self.config = config or {}
+
+        self.last_price = None
+        self.price_time = 0.0
+        self.candle_time = 0.0
+        self.ticks = 0
+        self.errors = 0
+
+        self._exchange = None
+        self._loop = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"feed-{self.symbol}", daemon=True)
+        self._thread.start()
+        logging.info(f"Streaming price feed started for {self.symbol} on {self.exchange_id}")
+
+    def stop(self, timeout=5.0):
+        self._running = False
+        loop = self._loop
+        if loop and loop.is_running():
+            # One callback that cancels everything from inside the loop: cancelling task by task from
+            # here raced with the loop finishing (and closing) after the first one
+            try:
+                loop.call_soon_threadsafe(self._cancel_tasks)
+            except RuntimeError:
+                pass  # Loop closed in the meantime, nothing left to cancel
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _cancel_tasks(self):
+        for task in asyncio.all_tasks(self._loop):
+            task.cancel()
+
+    def price(self, max_age=None):
+        """Latest streamed price, or None if nothing arrived within max_age seconds"""
+        max_age = self.max_age if max_age is None else max_age
+        if self.last_price is None or time.time() - self.price_time > max_age:
+            return None
+        return self.last_price
+
+    def candles_fresh(self, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        return time.time() - self.candle_time <= max_age
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        except Exception as e:
+            logging.error(f"Streaming price feed stopped: {e}")
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._exchange = getattr(ccxtpro, self.exchange_id)(dict(self.config))
+        if self.ws_url:
+            ws = self._exchange.urls['api']['ws']
+            if isinstance(ws, dict):
+                ws['public'] = self.ws_url
+            else:
+                self._exchange.urls['api']['ws'] = self.ws_url
+        if self.markets:
+            self._exchange.set_markets(self.markets)
+
+        watchers = [self._watch_ticker()]
+        if self.interval and self.on_candles and self._exchange.has.get('watchOHLCV'):
+            watchers.append(self._watch_ohlcv())
+        try:
+            await asyncio.gather(*watchers)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self._exchange.close()
+
+    async def _watch_ticker(self):
+        delay = 1.0
+        while self._running:
+            try:
+                ticker = await self._exchange.watch_ticker(self.symbol)
+                if ticker and ticker.get('last') is not None:
+                    self.last_price = float(ticker['last'])
+                    self.price_time = time.time()
+                    self.ticks += 1
+                delay = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logging.warning(f"Ticker stream error ({self.symbol}), retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    async def _watch_ohlcv(self):
+        delay = 1.0
+        while self._running:
+            try:
+                candles = await self._exchange.watch_ohlcv(self.symbol, self.interval)
+                if candles:
+                    # Last two rows: the candle that just closed and the one that is forming
+                    self.on_candles([list(c) for c in candles[-2:]])
+                    self.candle_time = time.time()
+                delay = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logging.warning(f"Candle stream error ({self.symbol}), retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
@@ -0,0 +1,73 @@
+"""The trader's in-memory trade history: the last few trades, everything older stays in the journal
+
+RSITrader used to keep every trade of the session in a list that grew for as long as the bot ran.
+TradeHistory keeps a fixed window of small records, plus the last buy and last sell (which can be
+older than the window) so the sell profit check never has to search, and a running count the
+dashboard uses as its trade cursor. Every trade is written through to the TradeJournal. Paper and
+real trades share the journal, a trader only loads the kind it makes: a paper run's last buy must
+not hold back the sells of a real one.
+"""
+import logging
+from collections import deque
+from itertools import islice
+
+
+class TradeRecord:
+    __slots__ = ('timestamp', 'side', 'price', 'amount', 'fee')
+
+    def __init__(self, timestamp, side, price, amount=0.0, fee=0.0):
+        self.timestamp = timestamp
+        self.side = side
+        self.price = price
+        self.amount = amount
+        self.fee = fee
+
+    def __repr__(self):
+        return f"TradeRecord({self.timestamp:%Y-%m-%d %H:%M:%S} {self.side} {self.amount:.8f} @ {self.price:.8f})"
+
+
+class TradeHistory:
+    def __init__(self, size=100, journal=None, paper=None):
+        self.size = size
+        self.journal = journal
+        self.paper = paper  # Only load paper (True) or real (False) trades from the journal, None = both
+        self.count = 0  # Every trade ever recorded, the journal's included
+        self._window = deque(maxlen=size)
+        self._last = {'buy': None, 'sell': None}
+        if journal is not None:
+            self._load()
+
+    def _load(self):
+        for trade in self.journal.tail(self.size, self.paper):
+            self._window.append(TradeRecord(trade.timestamp, trade.side, trade.price, trade.amount, trade.fee))
+        for side in self._last:
+            trade = self.journal.last(side, self.paper)
+            if trade is not None:
+                self._last[side] = TradeRecord(trade.timestamp, trade.side, trade.price, trade.amount, trade.fee)
+        self.count = len(self.journal)
+
+    def __len__(self):
+        return len(self._window)
+
+    def __iter__(self):
+        return iter(self._window)
+
+    def append(self, timestamp, side, price, amount=0.0, fee=0.0, paper=False):
+        record = TradeRecord(timestamp, side, price, amount, fee)
+        self._window.append(record)
+        self._last[side] = record
+        self.count += 1
+        if self.journal is not None:
+            try:
+                self.journal.append(timestamp, side, price, amount, fee, paper)
+            except Exception as e:
+                logging.error(f"Could not write trade to journal: {e}")
+        return record
+
+    def last(self, side):
+        """Most recent buy or sell, or None"""
+        return self._last[side]
+
+    def recent(self, count):
+        """The last `count` trades in memory, oldest first"""
+        return list(islice(reversed(self._window), count))[::-1]
@@ -0,0 +1,257 @@
+"""Append-only trade journal, so startup doesn't have to scrape the whole log for past trades
+
+Each trade is one fixed-size binary record, so the last N trades are a single seek from the end
+of the file. A tiny sidecar index (<journal>.idx) keeps the record count and the positions of the
+last buy and last sell, separately for real and paper trades, which makes the last buy price a
+constant-time lookup as well. Each record also links back to the previous trade of its kind, so the
+last N paper (or real) trades are N reads however many trades of the other kind are in between.
+"""
+import glob
+import gzip
+import logging
+import os
+import re
+import struct
+from collections import namedtuple
+from datetime import datetime
+
+# timestamp (epoch seconds), price, amount, fee, side (0=buy 1=sell), paper flag, how many records
+# back the previous trade of the same kind (paper/real) is (0 = written before that was kept), padding
+RECORD = struct.Struct('<ddddBBI2x')
+# record count, then the index of the last real buy, real sell, paper buy, paper sell (-1 = none)
+INDEX = struct.Struct('<qqqqq')
+SIDES = ('buy', 'sell')
+LAST_KEYS = (('buy', False), ('sell', False), ('buy', True), ('sell', True))
+UNLINKED_SCAN = 100000  # Most unlinked (older) records tail() looks through for trades of one kind
+
+Trade = namedtuple('Trade', 'timestamp side price amount fee paper')
+
+
+def journal_path(directory, exchange_id, symbol):
+    """One journal per exchange and pair, e.g. trades/kraken-DOGE_USDT.journal"""
+    safe_symbol = re.sub(r'[^A-Za-z0-9]+', '_', symbol)
+    return os.path.join(directory, f"{exchange_id}-{safe_symbol}.journal")
+
+
+class TradeJournal:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.existed = os.path.exists(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a+b')
+        self._count = 0
+        self._last = dict.fromkeys(LAST_KEYS, -1)
+        self._load_index()
+
+    def __len__(self):
+        return self._count
+
+    def _load_index(self):
+        size = os.path.getsize(self.path)
+        if size % RECORD.size:
+            # Torn write from a crash, drop the partial record
+            logging.warning(f"Trade journal {self.path} has a partial record, truncating it")
+            size -= size % RECORD.size
+            self._file.truncate(size)
+        count = size // RECORD.size
+
+        try:
+            with open(self.index_path, 'rb') as f:
+                indexed, *last = INDEX.unpack(f.read(INDEX.size))
+            if indexed == count:
+                self._count = count
+                self._last = dict(zip(LAST_KEYS, last))
+                return
+        except (OSError, struct.error):
+            pass
+
+        # Index missing, stale or from before paper/real were kept apart: walk back from the end
+        # until every side is found (all the way, once, for a journal with only one kind of trade)
+        self._count = count
+        self._last = dict.fromkeys(LAST_KEYS, -1)
+        for i in range(count - 1, -1, -1):
+            trade = self.read(i)
+            key = (trade.side, trade.paper)
+            if self._last[key] < 0:
+                self._last[key] = i
+                if min(self._last.values()) >= 0:
+                    break
+        self._write_index()
+
+    def _write_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX.pack(self._count, *(self._last[key] for key in LAST_KEYS)))
+        os.replace(tmp_path, self.index_path)
+
+    def append(self, timestamp, side, price, amount=0.0, fee=0.0, paper=False):
+        """Write one trade. timestamp can be a datetime or epoch seconds."""
+        self.extend([(timestamp, side, price, amount, fee, paper)])
+
+    def extend(self, trades):
+        """Write several trades with a single flush and index update"""
+        records = []
+        for timestamp, side, price, amount, fee, paper in trades:
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.timestamp()
+            paper = bool(paper)
+            index = self._count + len(records)
+            # -1 (no earlier trade of this kind) becomes a link to before the first record
+            back = index - self._latest(paper)
+            records.append(RECORD.pack(timestamp, price, amount, fee, SIDES.index(side), paper, back))
+            self._last[(side, paper)] = index
+        if not records:
+            return
+        self._file.write(b''.join(records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._count += len(records)
+        self._write_index()
+
+    def _latest(self, paper):
+        return max(self._last[('buy', paper)], self._last[('sell', paper)])
+
+    def read(self, index):
+        return self._read_linked(index)[0]
+
+    def _read_linked(self, index):
+        """(trade, records back to the previous trade of its kind, 0 = not linked)"""
+        self._file.seek(index * RECORD.size)
+        timestamp, price, amount, fee, side, paper, back = RECORD.unpack(self._file.read(RECORD.size))
+        return Trade(datetime.fromtimestamp(timestamp), SIDES[side], price, amount, fee, bool(paper)), back
+
+    def _read_range(self, start, end):
+        self._file.seek(start * RECORD.size)
+        raw = self._file.read((end - start) * RECORD.size)
+        return [self._unpack(raw[i:i + RECORD.size]) for i in range(0, len(raw), RECORD.size)]
+
+    def _unpack(self, raw):
+        timestamp, price, amount, fee, side, paper, _ = RECORD.unpack(raw)
+        return Trade(datetime.fromtimestamp(timestamp), SIDES[side], price, amount, fee, bool(paper))
+
+    def tail(self, count, paper=None):
+        """The last `count` trades, oldest first. paper=True/False only counts paper or real trades."""
+        if count <= 0:
+            return []
+        if paper is None:
+            return self._read_range(max(0, self._count - count), self._count)
+
+        paper = bool(paper)
+        trades = []
+        budget = UNLINKED_SCAN
+        index = self._latest(paper)
+        while index >= 0 and len(trades) < count:
+            trade, back = self._read_linked(index)
+            trades.append(trade)
+            if back:
+                index -= back
+            else:
+                index, budget = self._find_back(index - 1, paper, budget)
+        return trades[::-1]
+
+    def _find_back(self, index, paper, budget):
+        """Newest trade of one kind at or before `index` among unlinked records: (index or -1, budget left)"""
+        while index >= 0 and budget > 0:
+            start = max(0, index + 1 - min(1024, budget))
+            chunk = self._read_range(start, index + 1)
+            budget -= len(chunk)
+            for offset in range(len(chunk) - 1, -1, -1):
+                if chunk[offset].paper == paper:
+                    return start + offset, budget
+            index = start - 1
+        return -1, budget
+
+    def last(self, side, paper=None):
+        """Most recent buy or sell, or None. paper=True/False only looks at paper or real trades."""
+        if paper is None:
+            index = max(self._last[(side, False)], self._last[(side, True)])
+        else:
+            index = self._last[(side, bool(paper))]
+        return self.read(index) if index >= 0 else None
+
+    def close(self):
+        self._file.close()
+
+
+# Trade lines the bot has written to its log over time
+LOG_TIME = r'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) - \w+ - '
+PAPER_LINE = re.compile(LOG_TIME + r'PAPER (BUY|SELL): ([\d.]+) (\S+) at ([\d.]+)')
+REAL_LINE = re.compile(LOG_TIME + r'REAL (BUY|SELL) order placed: ID \S+, Quantity: ([\d.]+) (\S+), Price: ([\d.]+)')
+LEGACY_LINE = re.compile(LOG_TIME + r'.*Executed (buy|sell) order.*?price: ([\d.]+)')
+
+
+def parse_log_line(line, crypto_symbol=None):
+    """Trade from one log line, or None. Lines for other symbols are skipped when crypto_symbol is given."""
+    for pattern, paper in ((PAPER_LINE, True), (REAL_LINE, False)):
+        match = pattern.match(line)
+        if match:
+            time_text, side, amount, symbol, price = match.groups()
+            if crypto_symbol and symbol != crypto_symbol:
+                return None
+            return Trade(datetime.strptime(time_text, '%Y-%m-%d %H:%M:%S,%f'), side.lower(),
+                         float(price), float(amount), 0.0, paper)
+
+    match = LEGACY_LINE.match(line)
+    if match:
+        time_text, side, price = match.groups()
+        return Trade(datetime.strptime(time_text, '%Y-%m-%d %H:%M:%S,%f'), side, float(price), 0.0, 0.0, False)
+    return None
+
+
+def _open_log(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', errors='replace')
+    return open(path, 'r', errors='replace')
+
+
+def migrate_logs(journal, log_file, crypto_symbol=None):
+    """One-time import of the trades in an old log (and its rotated copies) into an empty journal"""
+    if len(journal):
+        return 0
+
+    paths = [p for p in glob.glob(glob.escape(log_file) + '*') if not p.endswith(('.journal', '.idx'))]
+    trades = []
+    for path in paths:
+        try:
+            with _open_log(path) as f:
+                for line in f:
+                    if 'PAPER' in line or 'REAL' in line or 'Executed' in line:
+                        trade = parse_log_line(line, crypto_symbol)
+                        if trade:
+                            trades.append(trade)
+        except OSError as e:
+            logging.error(f"Could not read {path} for trade migration: {e}")
+
+    # Rotated logs can come back in any order
+    trades.sort(key=lambda t: t.timestamp)
+    journal.extend(trades)
+    if trades:
+        logging.info(f"Imported {len(trades)} trades from {log_file} into {journal.path}")
+    return len(trades)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show or import trades in a trade journal")
+    parser.add_argument('journal', help="Journal file, e.g. trades/kraken-DOGE_USDT.journal")
+    parser.add_argument('--import-log', help="Import trades from this log file (only into an empty journal)")
+    parser.add_argument('--symbol', help="Only import trades for this crypto symbol, e.g. DOGE")
+    parser.add_argument('--last', type=int, default=20, help="How many recent trades to print")
+    args = parser.parse_args()
+
+    journal = TradeJournal(args.journal)
+    if args.import_log:
+        print(f"Imported {migrate_logs(journal, args.import_log, args.symbol)} trades")
+    for trade in journal.tail(args.last):
+        print(f"{trade.timestamp:%Y-%m-%d %H:%M:%S}  {trade.side.upper():4}  {trade.price:.8f}  "
+              f"{trade.amount:.8f}{'  (paper)' if trade.paper else ''}")
+    print(f"{len(journal)} trades in {journal.path}")
+    journal.close()
+
+
+if __name__ == "__main__":
+    main()
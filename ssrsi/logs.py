@@ -0,0 +1,164 @@
+"""Logging setup shared by the exchange scripts
+
+Log calls from the trading and Flask threads only put the record on a queue. One writer thread
+formats whatever has piled up, writes it to the file in a single write, and rotates the file by
+size into gzipped segments (rsi_trading-kraken.log.1.gz, .2.gz, ...). A slow SD card then stalls
+the writer thread instead of the trade loop.
+"""
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import sys
+import threading
+from logging.handlers import QueueHandler
+
+
+# Custom filter to prevent recursive warning messages
+class NoRecursiveWarningsFilter(logging.Filter):
+    def filter(self, record):
+        return not record.getMessage().startswith('Skipping malformed log line')
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller: when the queue is full the record is counted and dropped"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class QueuedLogWriter(threading.Thread):
+    """Writes queued records to the log file (and console) in batches, rotating by size"""
+
+    def __init__(self, log_queue, log_file, formatter, max_bytes=10 * 1024 * 1024, backup_count=5,
+                 batch_size=500, console=True):
+        super().__init__(daemon=True, name='log-writer')
+        self.queue = log_queue
+        self.log_file = log_file
+        self.formatter = formatter
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.console = console
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+        self._file = open(log_file, 'a', encoding='utf-8')
+        self._stopped = threading.Event()
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            batch = [record]
+            # Grab everything else already waiting, so a burst costs one write
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            self._write([r for r in batch if r is not None])
+            if stop:
+                self._file.close()
+                self._stopped.set()
+                return
+
+    def _write(self, records):
+        if not records:
+            return
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                self.errors += 1
+        text = '\n'.join(lines) + '\n'
+
+        try:
+            self._file.write(text)
+            self._file.flush()
+            if self.console:
+                sys.stderr.write(text)
+                sys.stderr.flush()
+            self.written += len(lines)
+            self.batches += 1
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception:
+            self.errors += 1
+
+    def _rotate(self):
+        """log -> log.1.gz, log.1.gz -> log.2.gz ... the oldest one beyond backup_count is deleted"""
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            older = f"{self.log_file}.{i}.gz"
+            if os.path.exists(older):
+                os.replace(older, f"{self.log_file}.{i + 1}.gz")
+
+        segment = f"{self.log_file}.1"
+        os.replace(self.log_file, segment)
+        self._file = open(self.log_file, 'a', encoding='utf-8')
+        if self.backup_count > 0:
+            with open(segment, 'rb') as src, gzip.open(segment + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        os.remove(segment)
+        self.rotations += 1
+
+    def stop(self, timeout=5.0):
+        """Write out what is still queued and close the file"""
+        if self.is_alive():
+            try:
+                self.queue.put(None, timeout=timeout)
+            except queue.Full:
+                return
+            self._stopped.wait(timeout)
+
+
+_handler = None
+_writer = None
+
+
+def setup_logging(log_file, max_bytes=10 * 1024 * 1024, backup_count=5, queue_size=10000):
+    global _handler, _writer
+    if _writer is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    _handler = DroppingQueueHandler(log_queue)
+    _handler.setFormatter(logging.Formatter('%(message)s'))  # only merges args/traceback, the writer adds the rest
+    _writer = QueuedLogWriter(log_queue, log_file, formatter, max_bytes, backup_count)
+    _writer.start()
+    atexit.register(_writer.stop)
+
+    logging.basicConfig(level=logging.INFO, handlers=[_handler])
+    logging.getLogger().addFilter(NoRecursiveWarningsFilter())
+
+
+def log_stats():
+    """Queue depth, dropped records and writer counters, for the dashboard"""
+    if _writer is None:
+        return {'enabled': False}
+    return {
+        'enabled': True,
+        'queue_depth': _writer.queue.qsize(),
+        'queue_size': _writer.queue.maxsize,
+        'dropped': _handler.dropped,
+        'written': _writer.written,
+        'batches': _writer.batches,
+        'rotations': _writer.rotations,
+        'errors': _writer.errors,
+        'log_file': _writer.log_file,
+        'log_bytes': os.path.getsize(_writer.log_file) if os.path.exists(_writer.log_file) else 0,
+    }
@@ -0,0 +1,200 @@
+"""In-process metrics in the Prometheus text format, served at /metrics
+
+Histograms of how long each ccxt call takes (rate-limit waits and retries included, since that is
+the time the loop actually spends), trade cycle and RSI compute times, error counters, plus
+process RSS and CPU. Recording a value is a lock, a bisect and two additions, so the trade loop
+doesn't notice it. Nothing is reset on scrape: counters only go up and Prometheus works out the
+rates, so any scrape interval works.
+
+    scrape_configs:
+      - job_name: ssrsi
+        scrape_interval: 15s
+        static_configs:
+          - targets: ['bot-host:5000']
+"""
+import asyncio
+import bisect
+import functools
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+# The ccxt calls that get a latency histogram
+ENDPOINTS = ('fetch_ticker', 'fetch_tickers', 'fetch_ohlcv', 'fetch_balance', 'fetch_order', 'fetch_open_orders',
+             'fetch_closed_orders', 'create_order', 'cancel_order', 'load_markets')
+
+EXCHANGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CYCLE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RSI_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_START_TIME = time.time()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=EXCHANGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+exchange_seconds = Histogram('ssrsi_exchange_request_seconds', "Time spent in a ccxt call, including rate-limit "
+                             "waits and retries", ('exchange', 'endpoint'), EXCHANGE_BUCKETS)
+exchange_errors = Counter('ssrsi_exchange_errors_total', "ccxt calls that raised, by exception class",
+                          ('exchange', 'endpoint', 'error'))
+cycle_seconds = Histogram('ssrsi_trade_cycle_seconds', "Duration of one trader's trade cycle", ('symbol',),
+                          CYCLE_BUCKETS)
+cycle_failures = Counter('ssrsi_trade_cycle_failures_total', "Trade cycles that ended without a price or RSI, "
+                         "or with an error", ('symbol',))
+rsi_seconds = Histogram('ssrsi_rsi_compute_seconds', "Time to fold new candles into the RSI (candle download "
+                        "not included)", ('symbol',), RSI_BUCKETS)
+
+COLLECTED = [exchange_seconds, exchange_errors, cycle_seconds, cycle_failures, rsi_seconds]
+
+
+def process_stats():
+    """RSS and CPU of this process, read at scrape time"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    try:
+        with open('/proc/self/statm') as f:
+            rss = int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # No /proc (macOS): peak RSS is the best we have, ru_maxrss is bytes there
+        rss = usage.ru_maxrss
+    return {
+        'process_resident_memory_bytes': ('gauge', "Resident memory size in bytes", rss),
+        'process_cpu_seconds_total': ('counter', "User and system CPU time in seconds",
+                                      usage.ru_utime + usage.ru_stime),
+        'process_start_time_seconds': ('gauge', "Start time of the process since the epoch in seconds", _START_TIME),
+        'ssrsi_threads': ('gauge', "Live Python threads", threading.active_count()),
+    }
+
+
+def render(gauges=()):
+    """The whole registry in the Prometheus text exposition format.
+
+    gauges: extra (name, help, [(labels dict, value)]) read by the caller at scrape time.
+    """
+    lines = []
+    for metric in COLLECTED:
+        lines.extend(metric.render())
+    for name, (kind, help, value) in process_stats().items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+    for name, help, samples in gauges:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def _timed(method, exchange_id, endpoint):
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapped(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception as e:
+                exchange_errors.inc(exchange_id, endpoint, type(e).__name__)
+                raise
+            finally:
+                exchange_seconds.observe(time.perf_counter() - started, exchange_id, endpoint)
+    else:
+        @functools.wraps(method)
+        def wrapped(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                exchange_errors.inc(exchange_id, endpoint, type(e).__name__)
+                raise
+            finally:
+                exchange_seconds.observe(time.perf_counter() - started, exchange_id, endpoint)
+    return wrapped
+
+
+def install(exchange, exchange_id=None):
+    """Time every endpoint in ENDPOINTS on a ccxt client (sync or async_support).
+
+    Install it last so the histogram covers what the caller waits for: rate limiting and retries.
+    """
+    exchange_id = exchange_id or getattr(exchange, 'id', 'exchange')
+    for name in ENDPOINTS:
+        method = getattr(exchange, name, None)
+        if method is not None:
+            setattr(exchange, name, _timed(method, exchange_id, name))
+    return exchange
@@ -0,0 +1,107 @@
+"""Paper order matching: resting limit orders that only fill once the market trades through them.
+
+Paper mode and the backtester both keep their orders in a PaperBook, so a paper run gets the same
+fills (and misses the same ones) a backtest over those candles would. A buy fills when a candle's
+low (or a later ticker price) goes below its limit, a sell when the high goes above it. Just touching
+the limit doesn't count: a real order at that level would likely still be queued behind others.
+Resting orders fill at their limit price with the maker fee, an order that already crosses the
+market when it is placed fills straight away at the market price with the taker fee.
+
+Pure Python (a heap per side), the live bot doesn't pull in numpy for this.
+"""
+import heapq
+import itertools
+from collections import namedtuple
+
+Fill = namedtuple('Fill', 'order price fee liquidity')
+
+
+class PaperOrder:
+    __slots__ = ('id', 'side', 'quantity', 'price', 'placed_ms', 'fill_from_ms')
+
+    def __init__(self, order_id, side, quantity, price, placed_ms, fill_from_ms):
+        self.id = order_id
+        self.side = side
+        self.quantity = quantity
+        self.price = price
+        self.placed_ms = placed_ms
+        self.fill_from_ms = fill_from_ms  # Candles/prices from this time on can fill it
+
+    def __repr__(self):
+        return f"PaperOrder({self.id}, {self.side} {self.quantity:.8f} @ {self.price:.8f})"
+
+
+class PaperBook:
+    def __init__(self, maker_fee, taker_fee, trade_through=True):
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.trade_through = trade_through  # False = touching the limit is enough to fill
+        self.orders = {}
+        # Best price on top: (-price, seq, order) for buys, (price, seq, order) for sells.
+        # Cancelled orders stay in the heap until they reach the top (see _sweep)
+        self._bids = []
+        self._asks = []
+        self._seq = itertools.count(1)
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __contains__(self, order_id):
+        return order_id in self.orders
+
+    def place(self, side, quantity, price, placed_ms, market_price=None, fill_from_ms=None):
+        """Add a limit order. Returns (order, fill), fill is None unless the order crossed market_price."""
+        seq = next(self._seq)
+        order = PaperOrder(f"paper-{seq}", side, quantity, price, placed_ms,
+                           placed_ms if fill_from_ms is None else fill_from_ms)
+        if market_price is not None and (price >= market_price if side == 'buy' else price <= market_price):
+            fee = quantity * market_price * self.taker_fee
+            return order, Fill(order, market_price, fee, 'taker')
+
+        self.orders[order.id] = order
+        if side == 'buy':
+            heapq.heappush(self._bids, (-price, seq, order))
+        else:
+            heapq.heappush(self._asks, (price, seq, order))
+        return order, None
+
+    def cancel(self, order_id):
+        """Remove a resting order, returns it (None if it already filled or never existed)"""
+        return self.orders.pop(order_id, None)
+
+    def expire(self, cutoff_ms):
+        """Cancel every order placed before cutoff_ms, returns them"""
+        expired = [order for order in self.orders.values() if order.placed_ms < cutoff_ms]
+        for order in expired:
+            del self.orders[order.id]
+        return expired
+
+    def match(self, timestamp, high, low):
+        """Fill what a candle opening at `timestamp` (or a price seen then, high == low) traded through"""
+        fills = []
+        if self._bids:
+            self._sweep(self._bids, -1, timestamp, low, fills)
+        if self._asks:
+            self._sweep(self._asks, 1, timestamp, high, fills)
+        return fills
+
+    def _sweep(self, heap, sign, timestamp, extreme, fills):
+        # sign -1: bids, filled when the low gets under the price. sign 1: asks, when the high gets over it
+        waiting = []
+        while heap:
+            key, seq, order = heap[0]
+            if self.orders.get(order.id) is not order:
+                heapq.heappop(heap)
+                continue
+            gap = (extreme - order.price) * sign
+            if gap < 0 or (gap == 0 and self.trade_through):
+                break
+            heapq.heappop(heap)
+            if order.fill_from_ms > timestamp:
+                # Placed after this candle opened, it only gets the later ones
+                waiting.append((key, seq, order))
+                continue
+            del self.orders[order.id]
+            fills.append(Fill(order, order.price, order.quantity * order.price * self.maker_fee, 'maker'))
+        for entry in waiting:
+            heapq.heappush(heap, entry)
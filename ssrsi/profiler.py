@@ -0,0 +1,185 @@
+"""Sampling profiler that can be switched on in a running bot
+
+cProfile means restarting the bot (and losing prices, rsis and active_orders) and slows every call
+down. This takes a snapshot of the stacks of the threads we care about (the trade loop and Flask's
+request threads by default) every few milliseconds with sys._current_frames(), for a bounded time,
+from a background thread. The profiled code isn't touched at all; the cost is the sampling thread
+waking up, which at the default 100 Hz is around 1% of one core (see 'overhead' in status()).
+
+Results download as collapsed stacks (flamegraph.pl, speedscope, https://www.speedscope.app) or as
+a pstats file (python -m pstats, snakeviz). Times in the pstats file are estimates: samples times
+the sampling interval, and "calls" are samples, not real call counts.
+"""
+import collections
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+
+MAX_SECONDS = 600
+DEFAULT_SCOPE = ('trade-loop', 'process_request_thread')  # Thread name fragments to sample, see _thread_label
+
+
+def _thread_label(thread):
+    # Flask/werkzeug starts a thread per request ("Thread-12 (process_request_thread)"), fold them together
+    if 'process_request_thread' in thread.name:
+        return 'flask'
+    return thread.name
+
+
+def _frame_key(code):
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.01, seconds=30, scope=DEFAULT_SCOPE):
+        self.interval = max(interval, 0.001)
+        self.seconds = min(seconds, MAX_SECONDS)
+        self.scope = scope  # None = every thread
+        self.stacks = collections.Counter()  # (thread label, frame keys root first) -> samples
+        self.samples = 0
+        self.started = None
+        self.stopped = None
+        self.sampling_time = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()  # Downloads can happen while sampling
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self.started = time.time()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        logging.info(f"Profiler started: {self.seconds}s at {1 / self.interval:.0f} Hz")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        deadline = time.monotonic() + self.seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            began = time.perf_counter()
+            self.sample()
+            self.sampling_time += time.perf_counter() - began
+        self.stopped = time.time()
+        logging.info(f"Profiler stopped after {self.stopped - self.started:.0f}s, {self.samples} samples")
+
+    def _wanted_threads(self):
+        wanted = {}
+        for thread in threading.enumerate():
+            if thread is self._thread:
+                continue
+            if self.scope is None or any(part in thread.name for part in self.scope):
+                wanted[thread.ident] = _thread_label(thread)
+        return wanted
+
+    def sample(self):
+        wanted = self._wanted_threads()
+        taken = []
+        for ident, frame in sys._current_frames().items():
+            label = wanted.get(ident)
+            if label is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_key(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            taken.append((label, tuple(stack)))
+        with self._lock:
+            self.stacks.update(taken)
+            self.samples += 1
+
+    def _stack_counts(self):
+        with self._lock:
+            return list(self.stacks.items())
+
+    def status(self):
+        elapsed = (self.stopped or time.time()) - self.started if self.started else 0.0
+        stacks = self._stack_counts()
+        return {
+            'running': self.running,
+            'seconds': self.seconds,
+            'interval_ms': self.interval * 1000,
+            'elapsed': round(elapsed, 1),
+            'samples': self.samples,
+            'distinct_stacks': len(stacks),
+            'threads': sorted({label for (label, _), _ in stacks}),
+            # Share of one core spent taking samples
+            'overhead': round(self.sampling_time / elapsed, 4) if elapsed else 0.0,
+        }
+
+    def collapsed(self):
+        """One 'thread;outer;...;inner count' line per distinct stack (Brendan Gregg's folded format)"""
+        lines = []
+        for (label, stack), count in sorted(self._stack_counts()):
+            frames = [label] + [f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack]
+            lines.append(f"{';'.join(frames)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def pstats_data(self):
+        """The samples as a marshalled pstats dict, loadable with pstats.Stats(path)"""
+        # func -> [primitive calls, calls, own time, cumulative time, {caller: [same four]}]
+        stats = {}
+
+        def entry(table, key):
+            if key not in table:
+                table[key] = [0, 0, 0.0, 0.0, {}] if table is stats else [0, 0, 0.0, 0.0]
+            return table[key]
+
+        for (_, stack), count in self._stack_counts():
+            spent = count * self.interval
+            seen = set()
+            for depth, func in enumerate(stack):
+                row = entry(stats, func)
+                leaf = depth == len(stack) - 1
+                if func not in seen:
+                    # Recursion counts a function's cumulative time only once per sample
+                    seen.add(func)
+                    row[0] += count
+                    row[1] += count
+                    row[3] += spent
+                if leaf:
+                    row[2] += spent
+                if depth:
+                    caller = entry(row[4], stack[depth - 1])
+                    caller[0] += count
+                    caller[1] += count
+                    caller[2] += spent if leaf else 0.0
+                    caller[3] += spent
+        return marshal.dumps({func: (cc, nc, tt, ct, {c: tuple(v) for c, v in callers.items()})
+                              for func, (cc, nc, tt, ct, callers) in stats.items()})
+
+
+_lock = threading.Lock()
+_current = None
+
+
+def start(seconds=30, interval=0.01, scope=DEFAULT_SCOPE):
+    """Start a profiling run (any run still going is stopped first). Returns the new profiler."""
+    global _current
+    with _lock:
+        if _current is not None and _current.running:
+            _current.stop()
+        _current = SamplingProfiler(interval, seconds, scope)
+        _current.start()
+        return _current
+
+
+def stop():
+    with _lock:
+        if _current is not None:
+            _current.stop()
+        return _current
+
+
+def current():
+    """The running or last finished profiler, or None"""
+    return _current
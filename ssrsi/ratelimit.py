@@ -0,0 +1,199 @@
+"""One rate-limit budget per exchange client, handed out by priority
+
+ccxt's own limiter is first come first served, so a dashboard refresh that needs a ticker can sit
+in front of a create_order. PriorityRateLimiter is a token bucket in ccxt's cost units (one token
+every exchange.rateLimit ms, each endpoint costs what ccxt says it costs, e.g. 3 for Kraken's
+private calls and 0 for AddOrder/CancelOrder). When several calls are waiting, the next token
+always goes to the most urgent one:
+
+    ORDER      create_order / cancel_order
+    STATUS     balance and order status
+    MARKET     tickers and candles for the trade loop
+    DASHBOARD  anything a web request triggers
+
+The priority comes from the method being called, unless a caller set one explicitly with
+`with priority(DASHBOARD):` (the dashboard does that for every request).
+"""
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+ORDER, STATUS, MARKET, DASHBOARD = range(4)
+CLASS_NAMES = ('order', 'status', 'market', 'dashboard')
+
+METHOD_PRIORITY = {
+    'create_order': ORDER,
+    'cancel_order': ORDER,
+    'fetch_order': STATUS,
+    'fetch_open_orders': STATUS,
+    'fetch_closed_orders': STATUS,
+    'fetch_balance': STATUS,
+    'fetch_ticker': MARKET,
+    'fetch_tickers': MARKET,
+    'fetch_ohlcv': MARKET,
+    'load_markets': MARKET,
+}
+
+_priority = contextvars.ContextVar('ssrsi_rate_priority', default=None)
+
+
+@contextmanager
+def priority(level):
+    """Run the calls inside the block at `level` (outermost setting wins)"""
+    if _priority.get() is not None:
+        yield
+        return
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_priority(level):
+    """Non-context-manager form of priority(), for hooks like Flask's before/teardown_request"""
+    return _priority.set(level)
+
+
+def reset_priority(token):
+    _priority.reset(token)
+
+
+def current_priority(default=MARKET):
+    level = _priority.get()
+    return default if level is None else level
+
+
+class PriorityRateLimiter:
+    def __init__(self, rate_limit_ms, burst=1.0, clock=time.monotonic):
+        self.interval = rate_limit_ms / 1000.0  # seconds per token
+        self.burst = float(burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self._updated = clock()
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = [{'calls': 0, 'waited': 0.0, 'max_wait': 0.0} for _ in CLASS_NAMES]
+
+    def _refill(self):
+        now = self.clock()
+        if self.interval > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) / self.interval)
+        else:
+            self.tokens = self.burst
+        self._updated = now
+
+    def try_acquire(self, cost=1, level=MARKET):
+        """Take the tokens only if that needs no waiting"""
+        cost = 1 if cost is None else cost
+        with self._cond:
+            self._refill()
+            if cost > 0 and (self._waiting or self.tokens < min(cost, self.burst)):
+                return False
+            self.tokens -= cost
+            self._stats[level]['calls'] += 1
+            return True
+
+    def acquire(self, cost=1, level=MARKET):
+        """Block until this call may go out. Returns the seconds it waited."""
+        cost = 1 if cost is None else cost
+        if cost <= 0:
+            # Free endpoints (Kraken's AddOrder/CancelOrder) never wait, same as in ccxt
+            with self._cond:
+                self._stats[level]['calls'] += 1
+            return 0.0
+        started = self.clock()
+        with self._cond:
+            ticket = (level, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    # Calls dearer than the burst go once the bucket is full and leave it in debt
+                    needed = min(cost, self.burst)
+                    if self._waiting[0] == ticket and self.tokens >= needed:
+                        break
+                    timeout = None
+                    if self._waiting[0] == ticket and self.interval > 0:
+                        timeout = (needed - self.tokens) * self.interval
+                    self._cond.wait(timeout)
+                self.tokens -= cost
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+            waited = self.clock() - started
+            stats = self._stats[level]
+            stats['calls'] += 1
+            stats['waited'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+        return waited
+
+    def stats(self):
+        """Current budget, queue and wait times per priority class"""
+        with self._cond:
+            self._refill()
+            queued = [0] * len(CLASS_NAMES)
+            for level, _ in self._waiting:
+                queued[level] += 1
+            return {
+                'tokens': round(self.tokens, 3),
+                'burst': self.burst,
+                'seconds_per_token': self.interval,
+                'classes': {
+                    name: {
+                        'calls': s['calls'],
+                        'queued': queued[level],
+                        'avg_wait_ms': round(s['waited'] / s['calls'] * 1000, 1) if s['calls'] else 0.0,
+                        'max_wait_ms': round(s['max_wait'] * 1000, 1),
+                    }
+                    for level, (name, s) in enumerate(zip(CLASS_NAMES, self._stats))
+                },
+            }
+
+
+def _with_priority(method, level):
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapped(*args, **kwargs):
+            with priority(level):
+                return await method(*args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def wrapped(*args, **kwargs):
+            with priority(level):
+                return method(*args, **kwargs)
+    return wrapped
+
+
+def install(exchange, limiter):
+    """Route a ccxt client's throttling through `limiter` and tag its methods with their priority.
+
+    Works for both the sync and the async_support client. Several clients can share one limiter,
+    which keeps their combined request rate inside one budget.
+    """
+    for name, level in METHOD_PRIORITY.items():
+        method = getattr(exchange, name, None)
+        if method is not None:
+            setattr(exchange, name, _with_priority(method, level))
+
+    if asyncio.iscoroutinefunction(getattr(exchange, 'fetch2', None)):
+        async def throttle(cost=None):
+            level = current_priority()
+            if not limiter.try_acquire(cost, level):
+                # Waiting blocks, so do it on a worker thread and keep the event loop free
+                await asyncio.get_running_loop().run_in_executor(None, limiter.acquire, cost, level)
+    else:
+        def throttle(cost=None):
+            limiter.acquire(cost, current_priority())
+
+    exchange.throttle = throttle
+    exchange.rate_limiter = limiter
+    return exchange
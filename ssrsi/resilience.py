@@ -0,0 +1,238 @@
+"""Retries with backoff and a circuit breaker per exchange endpoint
+
+Transient errors (ccxt.NetworkError and its children: timeouts, DDoS protection, exchange not
+available, rate limit exceeded) are retried with exponential backoff and full jitter, so a blip
+costs a second or two instead of a whole cycle. When an endpoint keeps failing its breaker opens
+and calls fail immediately with CircuitOpenError instead of hammering an exchange that is down.
+After reset_timeout one probe call is let through: success closes the breaker again, failure
+keeps it open for twice as long (up to max_reset_timeout).
+
+Errors that mean the exchange answered (InsufficientFunds, InvalidOrder, ...) are not retried and
+don't count as failures.
+"""
+import asyncio
+import functools
+import random
+import threading
+import time
+
+import ccxt
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+TRANSIENT_ERRORS = (ccxt.NetworkError,)
+
+# Retries per endpoint. create_order is never retried: a timeout there doesn't mean the order
+# didn't make it, and a second attempt could double the position.
+RETRIES = {
+    'create_order': 0,
+    'cancel_order': 1,
+    'fetch_order': 2,
+    'fetch_open_orders': 2,
+    'fetch_closed_orders': 2,
+    'fetch_balance': 2,
+    'fetch_ticker': 2,
+    'fetch_tickers': 2,
+    'fetch_ohlcv': 2,
+    'load_markets': 2,
+}
+
+
+class CircuitOpenError(ccxt.NetworkError):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+
+class Backoff:
+    """Exponential backoff with full jitter: a random delay in [0, min(max_delay, base * factor**attempt)]"""
+
+    def __init__(self, base=0.5, factor=2.0, max_delay=30.0):
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base * self.factor ** attempt))
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=15.0, max_reset_timeout=300.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go out now (in half-open state only one probe at a time)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._probing = False
+
+    def release(self):
+        """Give the probe slot back when a call ended without an answer either way (cancelled, interrupted)"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error else None
+            if self.state == HALF_OPEN:
+                # Probe failed, stay away longer
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.trips += 1
+        self._probing = False
+
+    def retry_in(self):
+        """Seconds until the next probe is allowed (0 unless open)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'trips': self.trips,
+            'retry_in': round(self.retry_in(), 1),
+            'last_error': self.last_error,
+        }
+
+
+class Resilience:
+    """The breakers and backoff for one exchange client, keyed by endpoint (ccxt method name)"""
+
+    def __init__(self, backoff=None, failure_threshold=5, reset_timeout=15.0, max_reset_timeout=300.0):
+        self.backoff = backoff or Backoff()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.breakers = {}
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint):
+        with self._lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout,
+                                                         self.max_reset_timeout)
+            return self.breakers[endpoint]
+
+    def _before(self, endpoint):
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{endpoint} circuit open, retry in {breaker.retry_in():.0f}s "
+                                   f"(last error: {breaker.last_error})")
+        return breaker
+
+    def _should_retry(self, breaker, error, attempt, retries):
+        if not isinstance(error, TRANSIENT_ERRORS) or isinstance(error, CircuitOpenError):
+            # The exchange answered, so as far as the breaker is concerned it's up
+            breaker.record_success()
+            return False
+        breaker.record_failure(error)
+        if attempt >= retries or breaker.state != CLOSED:
+            return False
+        self.retries += 1
+        return True
+
+    def call(self, endpoint, fn, *args, retries=None, **kwargs):
+        retries = RETRIES.get(endpoint, 0) if retries is None else retries
+        attempt = 0
+        while True:
+            breaker = self._before(endpoint)
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # CancelledError, KeyboardInterrupt: no verdict on the endpoint, but don't keep the probe
+                    breaker.release()
+                    raise
+                if not self._should_retry(breaker, e, attempt, retries):
+                    raise
+                time.sleep(self.backoff.delay(attempt))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    async def call_async(self, endpoint, fn, *args, retries=None, **kwargs):
+        retries = RETRIES.get(endpoint, 0) if retries is None else retries
+        attempt = 0
+        while True:
+            breaker = self._before(endpoint)
+            try:
+                result = await fn(*args, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # CancelledError, KeyboardInterrupt: no verdict on the endpoint, but don't keep the probe
+                    breaker.release()
+                    raise
+                if not self._should_retry(breaker, e, attempt, retries):
+                    raise
+                await asyncio.sleep(self.backoff.delay(attempt))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    def status(self):
+        """'ok', 'degraded' (some endpoint failing or probing) or 'down' (an endpoint's breaker is open)"""
+        states = [b.state for b in self.breakers.values()]
+        if OPEN in states:
+            return 'down'
+        if HALF_OPEN in states or any(b.failures for b in self.breakers.values()):
+            return 'degraded'
+        return 'ok'
+
+    def stats(self):
+        return {
+            'status': self.status(),
+            'retries': self.retries,
+            'endpoints': {name: b.stats() for name, b in sorted(self.breakers.items())},
+        }
+
+
+def install(exchange, resilience):
+    """Wrap a ccxt client's endpoints (sync or async_support) with retries and breakers"""
+    for name in RETRIES:
+        method = getattr(exchange, name, None)
+        if method is None:
+            continue
+        if asyncio.iscoroutinefunction(method):
+            async def wrapped(*args, _method=method, _name=name, **kwargs):
+                return await resilience.call_async(_name, _method, *args, **kwargs)
+        else:
+            def wrapped(*args, _method=method, _name=name, **kwargs):
+                return resilience.call(_name, _method, *args, **kwargs)
+        setattr(exchange, name, functools.wraps(method)(wrapped))
+    exchange.resilience = resilience
+    return exchange
@@ -0,0 +1,129 @@
+"""Streaming RSI that updates in constant time as candles close"""
+from collections import deque
+
+
+class StreamingRSI:
+    """Keeps a fixed window of gains/losses instead of re-running pandas over 100 bars.
+
+    method='sma'    -> simple moving average of gains/losses (what calculate_rsi used to do)
+    method='wilder' -> Wilder smoothing, seeded with the SMA of the first `period` moves
+    """
+
+    # Re-sum the window every so often so running float totals can't drift
+    RESYNC_EVERY = 1000
+
+    def __init__(self, period=14, method='sma'):
+        if period < 1:
+            raise ValueError(f"RSI period must be >= 1, got {period}")
+        if method not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown RSI method '{method}', use 'sma' or 'wilder'")
+
+        self.period = period
+        self.method = method
+        self.last_close = None
+        self.last_timestamp = None
+
+        self._gains = deque(maxlen=period)
+        self._losses = deque(maxlen=period)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._avg_gain = None  # Wilder averages, set once the window is full
+        self._avg_loss = None
+        self._updates = 0
+
+    @property
+    def ready(self):
+        return len(self._gains) == self.period
+
+    @property
+    def value(self):
+        """RSI as of the last closed candle, or None while warming up"""
+        if not self.ready:
+            return None
+        avg_gain, avg_loss = self._averages()
+        return self._to_rsi(avg_gain, avg_loss)
+
+    def reset(self):
+        self.__init__(self.period, self.method)
+
+    def seed(self, closes, timestamps=None):
+        """Feed a batch of closed candles, oldest first"""
+        for i, close in enumerate(closes):
+            self.update(close, timestamps[i] if timestamps is not None else None)
+        return self.value
+
+    def update(self, close, timestamp=None):
+        """Add one closed candle. Candles at or before the last timestamp are ignored."""
+        if timestamp is not None and self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return self.value
+
+        close = float(close)
+        if self.last_close is not None:
+            gain, loss = self._split(close - self.last_close)
+            self._push(gain, loss)
+        self.last_close = close
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        return self.value
+
+    def peek(self, close):
+        """RSI if `close` were the next candle, without committing it (for the still-open candle)"""
+        if self.last_close is None:
+            return None
+        gain, loss = self._split(float(close) - self.last_close)
+
+        if self.method == 'wilder' and self._avg_gain is not None:
+            n = self.period
+            return self._to_rsi((self._avg_gain * (n - 1) + gain) / n,
+                                (self._avg_loss * (n - 1) + loss) / n)
+
+        # SMA, or Wilder still seeding from the first full window
+        count = len(self._gains)
+        if count + 1 < self.period:
+            return None
+        gain_sum = self._gain_sum + gain
+        loss_sum = self._loss_sum + loss
+        if count == self.period:
+            gain_sum -= self._gains[0]
+            loss_sum -= self._losses[0]
+        return self._to_rsi(max(gain_sum, 0.0) / self.period, max(loss_sum, 0.0) / self.period)
+
+    @staticmethod
+    def _split(delta):
+        return (delta, 0.0) if delta > 0 else (0.0, -delta)
+
+    @staticmethod
+    def _to_rsi(avg_gain, avg_loss):
+        # Same convention as the old pandas version: no losses in the window means RSI 100
+        if avg_loss == 0:
+            return 100.0
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def _push(self, gain, loss):
+        if len(self._gains) == self.period:
+            self._gain_sum -= self._gains[0]
+            self._loss_sum -= self._losses[0]
+        self._gains.append(gain)
+        self._losses.append(loss)
+        self._gain_sum += gain
+        self._loss_sum += loss
+
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            self._gain_sum = sum(self._gains)
+            self._loss_sum = sum(self._losses)
+
+        if self.method == 'wilder' and self.ready:
+            n = self.period
+            if self._avg_gain is None:
+                self._avg_gain = self._gain_sum / n
+                self._avg_loss = self._loss_sum / n
+            else:
+                self._avg_gain = (self._avg_gain * (n - 1) + gain) / n
+                self._avg_loss = (self._avg_loss * (n - 1) + loss) / n
+
+    def _averages(self):
+        if self.method == 'wilder':
+            return self._avg_gain, self._avg_loss
+        return max(self._gain_sum, 0.0) / self.period, max(self._loss_sum, 0.0) / self.period
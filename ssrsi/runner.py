@@ -0,0 +1,125 @@
+"""Run several RSITraders from one process on one shared exchange client"""
+import logging
+import threading
+import time
+
+from ssrsi.scheduler import DueTracker, scheduler_for
+
+
+class MultiSymbolRunner:
+    """Drives N traders off a single exchange adapter (one connection, one rate limiter).
+
+    Each cycle makes one fetch_tickers call for every symbol and at most one fetch_balance,
+    puts the results in each trader's snapshot, then runs the traders' cycles one after the
+    other. A trader that places a real order gets the balance refetched before the next one
+    runs, since they all draw on the same USDT.
+
+    Cycles run right after each candle closes (see ssrsi.scheduler), with only order checks in
+    between. Pass cycle_seconds to go back to a fixed cadence.
+    """
+
+    def __init__(self, adapter, traders, cycle_seconds=None):
+        self.adapter = adapter
+        self.exchange = adapter.exchange
+        self.traders = list(traders)
+        self.cycle_seconds = cycle_seconds
+        self._stop = threading.Event()
+        self._unified = {}  # trader symbol -> ccxt unified symbol, fetch_tickers keys by the latter
+
+    def unified_symbol(self, symbol):
+        if symbol not in self._unified:
+            try:
+                self.exchange.load_markets()
+                self._unified[symbol] = self.exchange.market(symbol)['symbol']
+            except Exception as e:
+                logging.warning(f"Could not resolve market for {symbol}: {e}")
+                return symbol
+        return self._unified[symbol]
+
+    def fetch_prices(self, traders):
+        """{trader symbol: last price} for the traders that don't have a fresh streamed price"""
+        wanted = [t.symbol for t in traders if not (t.price_feed and t.price_feed.price() is not None)]
+        if not wanted:
+            return {}
+        try:
+            if len(wanted) > 1 and self.adapter.supports('fetchTickers'):
+                tickers = self.exchange.fetch_tickers([self.unified_symbol(s) for s in wanted])
+            else:
+                tickers = {self.unified_symbol(s): self.exchange.fetch_ticker(s) for s in wanted}
+        except Exception as e:
+            # Traders fall back to their own fetch_ticker when the snapshot is empty
+            logging.warning(f"Batched ticker fetch failed: {e}")
+            return {}
+
+        prices = {}
+        for symbol in wanted:
+            ticker = tickers.get(self.unified_symbol(symbol))
+            if ticker and ticker.get('last') is not None:
+                prices[symbol] = float(ticker['last'])
+        return prices
+
+    def fetch_balance(self, traders):
+        if all(t.paper_trading for t in traders):
+            return None
+        try:
+            return self.exchange.fetch_balance()
+        except Exception as e:
+            logging.error(f"Balance update failed: {e}")
+            return None
+
+    def run_cycle(self, traders=None):
+        """Returns the traders that couldn't get a price or RSI this time"""
+        traders = self.traders if traders is None else traders
+        prices = self.fetch_prices(traders)
+        balance = self.fetch_balance(traders)
+
+        failed = []
+        for trader in traders:
+            if trader.symbol in prices:
+                trader.snapshot.put('price', prices[trader.symbol])
+            if balance is not None:
+                trader.snapshot.put('balance', balance)
+
+            orders_before = len(trader.active_orders)
+            if not trader.run_cycle(refresh=False):
+                failed.append(trader)
+
+            if not trader.paper_trading and len(trader.active_orders) > orders_before:
+                balance = self.fetch_balance(traders)
+        return failed
+
+    def run_checks(self):
+        """The cheap in-between-candles pass: resting order statuses and stale order cancels, nothing else"""
+        for trader in self.traders:
+            if trader.active_orders:
+                trader.reconcile_orders()
+                trader.check_and_cancel_stale_orders()
+
+    def run_forever(self):
+        symbols = ', '.join(t.display_symbol for t in self.traders)
+        logging.info(f"Running {len(self.traders)} trader(s) on one {self.adapter.display_name} client: {symbols}")
+        if self.cycle_seconds:
+            while not self._stop.is_set():
+                started = time.time()
+                self.run_cycle()
+                self._stop.wait(max(self.cycle_seconds - (time.time() - started), 1))
+            return
+
+        scheduler = scheduler_for(self.traders)
+        due = DueTracker(scheduler)
+        failed = self.run_cycle(due.due(self.traders))
+        scheduler.cycle_done(failed)
+        while True:
+            kind = scheduler.wait(self._stop)
+            if kind is None:
+                return
+            if kind == 'check':
+                self.run_checks()
+                continue
+
+            traders = due.due(self.traders) if kind == 'candle' else failed
+            failed = self.run_cycle(traders) if traders else []
+            scheduler.cycle_done(failed)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,126 @@
+"""Wake up right after each candle closes instead of every 60 seconds
+
+With 5m candles a fixed 60 second loop recomputes the same closed candle 4 times out of 5, and
+still sees a new candle up to a minute late. CandleScheduler sleeps until the next interval
+boundary plus a small grace period (exchanges take a few seconds to publish the closed candle).
+In between it can hand out cheap 'check' wakeups, used for order status checks only, and
+'retry' wakeups with backoff when a cycle couldn't get its data, so a short exchange blip costs
+seconds rather than a whole candle.
+"""
+import asyncio
+import math
+import time
+
+import ccxt
+
+from ssrsi.resilience import Backoff
+
+
+def interval_seconds(interval):
+    return ccxt.Exchange.parse_timeframe(interval)
+
+
+class CandleScheduler:
+    def __init__(self, interval, grace=5.0, check_every=None, clock=time.time):
+        self.interval = interval
+        self.period = interval_seconds(interval)
+        self.grace = grace
+        self.check_every = check_every
+        self.clock = clock
+        self.backoff = Backoff(base=2.0, max_delay=60.0)
+        self.retry_attempt = 0
+        self._retry_at = None
+        self._last_check = None
+
+    def candle_index(self, now=None, period=None):
+        """Which candle has most recently closed (counting its grace period), for `period` seconds candles"""
+        now = self.clock() if now is None else now
+        return math.floor((now - self.grace) / (period or self.period))
+
+    def next_boundary(self, now=None):
+        """Epoch seconds of the next candle close plus grace"""
+        now = self.clock() if now is None else now
+        return (self.candle_index(now) + 1) * self.period + self.grace
+
+    def cycle_done(self, failed):
+        """Tell the scheduler whether the last cycle failed, to get a 'retry' wakeup before the next candle"""
+        if not failed:
+            self.retry_attempt = 0
+            self._retry_at = None
+            return
+        self._retry_at = self.clock() + max(1.0, self.backoff.delay(self.retry_attempt))
+        self.retry_attempt += 1
+
+    def next_wakeup(self, now=None):
+        """(when, 'candle' | 'retry' | 'check')"""
+        now = self.clock() if now is None else now
+        boundary = self.next_boundary(now)
+        # A retry that would land after the candle close is pointless, the candle cycle covers it
+        if self._retry_at is not None and self._retry_at < boundary:
+            return self._retry_at, 'retry'
+        if self.check_every:
+            last_check = self._last_check if self._last_check is not None else now
+            check_at = max(last_check + self.check_every, now)
+            # Not worth a separate wakeup right before a candle, the candle cycle checks orders too
+            if check_at < boundary - self.check_every / 2:
+                return check_at, 'check'
+        return boundary, 'candle'
+
+    def _woke(self, kind, when):
+        self._last_check = when
+        if kind != 'check':
+            self._retry_at = None
+        return kind
+
+    def wait(self, stop=None):
+        """Sleep until the next wakeup. Returns its kind, or None if `stop` (a threading.Event) got set."""
+        when, kind = self.next_wakeup()
+        delay = max(when - self.clock(), 0)
+        if stop is not None:
+            if stop.wait(delay):
+                return None
+        else:
+            time.sleep(delay)
+        return self._woke(kind, when)
+
+    async def wait_async(self, stop=None):
+        """wait() for an event loop, `stop` being an asyncio.Event"""
+        when, kind = self.next_wakeup()
+        delay = max(when - self.clock(), 0)
+        if stop is not None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+                return None
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(delay)
+        return self._woke(kind, when)
+
+
+class DueTracker:
+    """Remembers which candle each trader last ran on, so traders on longer intervals
+    (15m next to 5m, say) only get a full cycle when their own candle closes"""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self._last = {}
+
+    def due(self, traders, now=None):
+        now = self.scheduler.clock() if now is None else now
+        due = []
+        for trader in traders:
+            index = self.scheduler.candle_index(now, interval_seconds(trader.interval))
+            if self._last.get(id(trader)) != index:
+                self._last[id(trader)] = index
+                due.append(trader)
+        return due
+
+
+def scheduler_for(traders):
+    """One scheduler for a group of traders: their shortest interval, longest grace, shortest check period"""
+    shortest = min(traders, key=lambda t: interval_seconds(t.interval))
+    checks = [t.order_check_seconds for t in traders if t.order_check_seconds]
+    return CandleScheduler(shortest.interval,
+                           grace=max(t.candle_grace_seconds for t in traders),
+                           check_every=min(checks) if checks else None)
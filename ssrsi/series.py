@@ -0,0 +1,67 @@
+"""Fixed-size numeric series for the dashboard chart: timestamp (epoch seconds), price and RSI per point
+
+The trader used to keep three lists (timestamps as formatted strings) and re-slice all of them to
+max_data_points on every cycle. ChartSeries is a ring buffer of array('d') columns where each point
+is written twice, at slot and slot + capacity, so the last N points are always one contiguous run
+and readers get them as memoryview slices without copying. Appending is O(1) whatever the capacity.
+"""
+import threading
+from array import array
+
+FIELDS = ('timestamps', 'prices', 'rsi_values')
+
+
+class ChartSeries:
+    def __init__(self, capacity=100):
+        if capacity < 1:
+            raise ValueError("Chart capacity must be at least 1")
+        self.lock = threading.Lock()  # Held by writers, and by readers on other threads while they copy
+        self.capacity = capacity
+        self.size = 0  # Points held, up to capacity
+        self.seq = 0  # Points ever added, the /update_data cursor
+        self._columns = [array('d', bytes(16 * capacity)) for _ in FIELDS]
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp, price, rsi):
+        slot = self.seq % self.capacity
+        mirror = slot + self.capacity
+        for column, value in zip(self._columns, (timestamp, price, rsi)):
+            column[slot] = column[mirror] = value
+        self.seq += 1
+        if self.size < self.capacity:
+            self.size += 1
+
+    def last(self, count=None):
+        """{field: memoryview} of the last `count` points (all of them by default), oldest first.
+
+        The views point into the buffer: the next append can overwrite their oldest point, so
+        copy them (under self.lock when another thread appends) if they have to outlive that.
+        """
+        count = self.size if count is None else max(0, min(count, self.size))
+        end = (self.seq - 1) % self.capacity + 1 + self.capacity
+        return {name: memoryview(column)[end - count:end] for name, column in zip(FIELDS, self._columns)}
+
+    def since(self, cursor):
+        """Points added after `cursor`: (views, new_cursor, reset).
+
+        reset=True means the cursor is unknown or too old and the views hold the whole window.
+        """
+        new_points = self.seq - cursor
+        reset = cursor <= 0 or new_points < 0 or new_points > self.size
+        return self.last(None if reset else new_points), self.seq, reset
+
+    def resize(self, capacity):
+        """Change capacity, keeping the newest points and the cursor"""
+        if capacity < 1:
+            raise ValueError("Chart capacity must be at least 1")
+        kept = self.last(capacity)
+        points = list(zip(*(view.tolist() for view in kept.values())))
+        seq = self.seq
+        self.capacity = capacity
+        self._columns = [array('d', bytes(16 * capacity)) for _ in FIELDS]
+        self.size = 0
+        self.seq = seq - len(points)
+        for point in points:
+            self.append(*point)
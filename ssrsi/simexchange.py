@@ -0,0 +1,976 @@
+"""Local simulated exchange speaking Kraken's REST API, for testing the real-order path offline
+
+Paper trading never calls create_order / fetch_order / cancel_order, so those paths only ever ran
+with real money. This serves enough of Kraken's public and private REST API for ccxt.kraken (and so
+the whole bot: rate limiter, retries, order reconcile, stale order cancels) to trade against an
+in-memory market:
+
+  * a random-walk price per pair with a bid/ask spread and 1m candles (aggregated to any interval)
+  * resting limit orders that fill (partially, with limited liquidity per tick) as the price
+    crosses them, balances with funds on hold, maker/taker fees
+  * Kraken's rate limits: the private API call counter, the per-pair order counter (cancelling a
+    young order costs more) and a public request budget, with Kraken's error messages
+  * strictly increasing nonces per API key, like Kraken without a nonce window
+  * injected latency (lognormal), errors (EService:Unavailable, HTTP 502) and hung requests.
+    A hung AddOrder has placed the order already, like a real timeout can.
+
+Serve it and point the adapter at it:
+
+    python -m ssrsi.simexchange --port 8766 --latency-ms 80 --error-rate 0.02
+
+    adapter = KrakenAdapter(*simexchange.CREDENTIALS, config=simexchange.client_config('http://127.0.0.1:8766'))
+
+or run the built-in load test, which drives RSITraders' real order path against it and reports
+throughput and latency percentiles:
+
+    python -m ssrsi.simexchange --load --traders 4 --rounds 50 --latency-ms 80 --error-rate 0.02
+
+--exchange coinbase serves the same market over the Coinbase Advanced Trade routes ccxt.coinbase
+needs for the bot instead (SimulatedCoinbase), for CoinbaseAdapter with
+client_config(url, exchange='coinbase'). Kraken's order counters and nonces don't apply there.
+"""
+import argparse
+import asyncio
+import base64
+import email.utils
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import math
+import random
+import statistics
+import string
+import time
+import uuid
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+CREDENTIALS = ('sim-key', base64.b64encode(b'simulated-exchange-secret').decode())
+
+# Symbol -> (Kraken asset id, altname, starting price)
+ASSETS = {
+    'DOGE': ('XXDG', 'XDG', 0.2),
+    'BTC': ('XXBT', 'XBT', 60000.0),
+    'ETH': ('XETH', 'ETH', 3000.0),
+    'SOL': ('SOL', 'SOL', 150.0),
+    'ADA': ('ADA', 'ADA', 0.45),
+    'USDT': ('USDT', 'USDT', 1.0),
+}
+
+# Kraken's rate limits per verification tier: (API counter max, decay per second)
+TIERS = {'starter': (15, 0.33), 'intermediate': (20, 0.5), 'pro': (20, 1.0)}
+ORDER_COUNTER_MAX = 60  # Per pair, decays 1 per second
+PRIVATE_COST = {'AddOrder': 0, 'CancelOrder': 0, 'ClosedOrders': 2}  # Everything else costs 1
+# Extra order-counter cost of cancelling an order, by its age in seconds
+CANCEL_PENALTY = ((5, 8), (10, 6), (15, 5), (45, 4), (90, 2), (300, 1))
+
+# Coinbase Advanced Trade: requests per second (and burst) per API key
+COINBASE_LIMITS = {'public': 10, 'private': 30}
+GRANULARITIES = {'ONE_MINUTE': 1, 'FIVE_MINUTE': 5, 'FIFTEEN_MINUTE': 15, 'THIRTY_MINUTE': 30,
+                 'ONE_HOUR': 60, 'TWO_HOUR': 120, 'SIX_HOUR': 360, 'ONE_DAY': 1440}
+
+
+def client_config(url, timeout_ms=10000, rate_limit_ms=None, exchange='kraken'):
+    """ccxt options that send a Kraken (or Coinbase) client to the simulator instead of the real API.
+
+    rate_limit_ms overrides ccxt's pacing (1000 ms per cost unit for Kraken, so a private call every 3 s)
+    to push the simulator's own rate limits.
+    """
+    api = {'rest': url} if exchange == 'coinbase' else {'public': url, 'private': url}
+    config = {'urls': {'api': api}, 'timeout': timeout_ms}
+    if rate_limit_ms is not None:
+        config['rateLimit'] = rate_limit_ms
+    return config
+
+
+class KrakenError(Exception):
+    """An error Kraken reports in the 'error' list of a 200 response"""
+
+
+class Pair:
+    def __init__(self, symbol, price, random_source, history_minutes):
+        base = symbol.split('/')[0]
+        self.base_id, self.base_alt, _ = ASSETS.get(base, (base, base, price))
+        self.id = f"{self.base_alt}USDT"
+        self.wsname = f"{self.base_alt}/USDT"
+        self.symbol = symbol
+        self.price = price
+        self.random = random_source
+        self.minutes = {}  # minute start (epoch s) -> [o, h, l, c, v]
+        self._backfill(history_minutes)
+
+    def _backfill(self, minutes):
+        # Walk backwards from the current price so the history ends where the live price starts
+        now = int(time.time()) // 60 * 60
+        close = self.price
+        for i in range(minutes, 0, -1):
+            open_ = close / (1 + self.random.gauss(0, 0.002))
+            high = max(open_, close) * (1 + abs(self.random.gauss(0, 0.001)))
+            low = min(open_, close) * (1 - abs(self.random.gauss(0, 0.001)))
+            self.minutes[now - i * 60] = [open_, high, low, close, self.random.uniform(1000, 5000)]
+            close = open_
+
+    def tick(self, volatility, now):
+        self.price *= 1 + self.random.gauss(0, volatility)
+        minute = int(now) // 60 * 60
+        candle = self.minutes.get(minute)
+        if candle is None:
+            self.minutes[minute] = [self.price, self.price, self.price, self.price, 0.0]
+        else:
+            candle[1] = max(candle[1], self.price)
+            candle[2] = min(candle[2], self.price)
+            candle[3] = self.price
+            candle[4] += self.random.uniform(0, 50)
+
+    def ohlc(self, interval_minutes, since=None, limit=720):
+        seconds = interval_minutes * 60
+        now = time.time()
+        first = int(now) // seconds * seconds - (limit - 1) * seconds
+        if since is not None:
+            first = max(first, int(since) // seconds * seconds)
+        rows = {}
+        for start in sorted(m for m in self.minutes if m >= first):
+            o, h, l, c, v = self.minutes[start]
+            bucket = start // seconds * seconds
+            row = rows.get(bucket)
+            if row is None:
+                rows[bucket] = [bucket, o, h, l, c, v]
+            else:
+                row[2] = max(row[2], h)
+                row[3] = min(row[3], l)
+                row[4] = c
+                row[5] += v
+        return list(rows.values())
+
+
+class Order:
+    _ids = itertools.count(1)
+
+    def __init__(self, pair, side, volume, price):
+        n = next(self._ids)
+        letters = ''.join(random.choices(string.ascii_uppercase, k=5))
+        self.txid = f"O{n:05d}-{letters}-SIM{n % 1000:03d}"
+        self.pair = pair
+        self.side = side
+        self.volume = volume
+        self.price = price
+        self.filled = 0.0
+        self.cost = 0.0
+        self.fee = 0.0
+        self.client_id = None
+        self.status = 'open'
+        self.reason = None
+        self.opened = time.time()
+        self.closed = None
+
+    @property
+    def remaining(self):
+        return self.volume - self.filled
+
+    def describe(self):
+        return {
+            'refid': None, 'userref': 0, 'status': self.status, 'reason': self.reason,
+            'opentm': self.opened, 'closetm': self.closed or 0, 'starttm': 0, 'expiretm': 0,
+            'descr': {
+                'pair': self.pair.id, 'type': self.side, 'ordertype': 'limit', 'price': f"{self.price:.8f}",
+                'price2': '0', 'leverage': 'none', 'close': '',
+                'order': f"{self.side} {self.volume:.8f} {self.pair.id} @ limit {self.price:.8f}",
+            },
+            'vol': f"{self.volume:.8f}", 'vol_exec': f"{self.filled:.8f}", 'cost': f"{self.cost:.8f}",
+            'fee': f"{self.fee:.8f}", 'price': f"{self.cost / self.filled if self.filled else 0:.8f}",
+            'stopprice': '0.00000000', 'limitprice': '0.00000000', 'misc': '', 'oflags': 'fciq',
+        }
+
+
+class SimulatedKraken:
+    name = 'Kraken'
+
+    def __init__(self, symbols=('DOGE/USDT',), balances=None, spread=0.001, volatility=0.0008,
+                 tick_seconds=0.25, liquidity=None, maker_fee=0.0016, taker_fee=0.0026,
+                 latency_ms=0.0, jitter=0.5, error_rate=0.0, hang_rate=0.0, hang_seconds=30.0,
+                 rate_limits=True, tier='starter', seed=None, history_minutes=720 * 15):
+        self.random = random.Random(seed)
+        self.pairs = {}
+        for symbol in symbols:
+            base = symbol.split('/')[0]
+            self.pairs[symbol] = Pair(symbol, ASSETS.get(base, (base, base, 1.0))[2], self.random, history_minutes)
+        self.by_id = {p.id: p for p in self.pairs.values()}
+        self.spread = spread
+        self.volatility = volatility
+        self.tick_seconds = tick_seconds
+        self.liquidity = liquidity  # USDT worth that can fill per pair per tick, None = unlimited
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+
+        # asset id -> [total, on hold]
+        self.balances = {}
+        for code, amount in (balances or self.default_balances()).items():
+            asset_id = ASSETS.get(code, (code,))[0]
+            self.balances[asset_id] = [float(amount), 0.0]
+        self.orders = {}
+
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.rate_limits = rate_limits
+        self.api_max, self.api_decay = TIERS[tier]
+        self.api_counter = 0.0
+        self.order_counters = {}  # pair id -> counter
+        self.public_tokens = 5.0
+        self._counters_at = time.monotonic()
+        self.nonces = {}
+
+        self.stats = {'requests': {}, 'injected_errors': 0, 'hung': 0, 'rate_limited': 0, 'invalid_nonce': 0,
+                      'orders': 0, 'fills': 0, 'cancels': 0}
+
+    def default_balances(self):
+        balances = {'USDT': 100000.0}
+        for pair in self.pairs.values():
+            base = pair.symbol.split('/')[0]
+            balances[base] = 100000.0 / pair.price
+        return balances
+
+    # --- market ---
+
+    def bid_ask(self, pair):
+        return pair.price * (1 - self.spread / 2), pair.price * (1 + self.spread / 2)
+
+    def tick(self):
+        now = time.time()
+        for pair in self.pairs.values():
+            pair.tick(self.volatility, now)
+            bid, ask = self.bid_ask(pair)
+            budget = self.liquidity / pair.price if self.liquidity else math.inf
+            for order in [o for o in self.orders.values() if o.pair is pair and o.status == 'open']:
+                crossed = order.price >= ask if order.side == 'buy' else order.price <= bid
+                if crossed and budget > 0:
+                    budget -= self._fill(order, min(order.remaining, budget), order.price, self.maker_fee)
+
+    def _fill(self, order, volume, price, fee_rate):
+        if volume <= 0:
+            return 0.0
+        cost = volume * price
+        fee = cost * fee_rate
+        base, quote = self.balances.setdefault(order.pair.base_id, [0.0, 0.0]), self.balances['USDT']
+        if order.side == 'buy':
+            quote[1] -= order.price * volume * (1 + self.taker_fee)
+            quote[0] -= cost + fee
+            base[0] += volume
+        else:
+            base[1] -= volume
+            base[0] -= volume
+            quote[0] += cost - fee
+        order.filled += volume
+        order.cost += cost
+        order.fee += fee
+        self.stats['fills'] += 1
+        if order.remaining <= 1e-12:
+            self._close(order, 'closed')
+        return volume
+
+    def _close(self, order, status, reason=None):
+        order.status = status
+        order.reason = reason
+        order.closed = time.time()
+        # Release whatever is still on hold
+        if order.side == 'buy':
+            self.balances['USDT'][1] -= order.price * order.remaining * (1 + self.taker_fee)
+        else:
+            self.balances[order.pair.base_id][1] -= order.remaining
+        for held in self.balances.values():
+            held[1] = max(held[1], 0.0)
+
+    # --- rate limits ---
+
+    def _decay(self):
+        now = time.monotonic()
+        elapsed, self._counters_at = now - self._counters_at, now
+        self.api_counter = max(0.0, self.api_counter - elapsed * self.api_decay)
+        for pair_id in self.order_counters:
+            self.order_counters[pair_id] = max(0.0, self.order_counters[pair_id] - elapsed)
+        self.public_tokens = min(5.0, self.public_tokens + elapsed)
+
+    def _charge_public(self):
+        if not self.rate_limits:
+            return
+        self._decay()
+        if self.public_tokens < 1:
+            raise KrakenError('EGeneral:Too many requests')
+        self.public_tokens -= 1
+
+    def _charge_private(self, method):
+        if not self.rate_limits:
+            return
+        self._decay()
+        cost = PRIVATE_COST.get(method, 1)
+        if cost and self.api_counter + cost > self.api_max:
+            raise KrakenError('EAPI:Rate limit exceeded')
+        self.api_counter += cost
+
+    def _charge_order(self, pair, cost):
+        if not self.rate_limits:
+            return
+        self._decay()
+        counter = self.order_counters.get(pair.id, 0.0)
+        if counter + cost > ORDER_COUNTER_MAX:
+            raise KrakenError('EOrder:Rate limit exceeded')
+        self.order_counters[pair.id] = counter + cost
+
+    # --- public endpoints ---
+
+    def public_Time(self, params):
+        now = time.time()
+        return {'unixtime': int(now), 'rfc1123': email.utils.formatdate(now, usegmt=True)}
+
+    def public_Assets(self, params):
+        assets = {}
+        for code, (asset_id, altname, _) in ASSETS.items():
+            if code == 'USDT' or any(p.base_id == asset_id for p in self.pairs.values()):
+                assets[asset_id] = {'aclass': 'currency', 'altname': altname, 'decimals': 8, 'display_decimals': 5}
+        return assets
+
+    def public_AssetPairs(self, params):
+        return {pair.id: {
+            'altname': pair.id, 'wsname': pair.wsname, 'aclass_base': 'currency', 'base': pair.base_id,
+            'aclass_quote': 'currency', 'quote': 'USDT', 'lot': 'unit', 'pair_decimals': 8, 'lot_decimals': 8,
+            'lot_multiplier': 1, 'leverage_buy': [], 'leverage_sell': [],
+            'fees': [[0, self.taker_fee * 100]], 'fees_maker': [[0, self.maker_fee * 100]],
+            'fee_volume_currency': 'ZUSD', 'margin_call': 80, 'margin_stop': 40, 'ordermin': '0.00000001',
+            'costmin': '0.5', 'status': 'online',
+        } for pair in self.pairs.values()}
+
+    def _pairs_param(self, params):
+        ids = params.get('pair')
+        if not ids:
+            return list(self.pairs.values())
+        try:
+            return [self.by_id[i] for i in ids.split(',')]
+        except KeyError:
+            raise KrakenError('EQuery:Unknown asset pair') from None
+
+    def public_Ticker(self, params):
+        result = {}
+        for pair in self._pairs_param(params):
+            bid, ask = self.bid_ask(pair)
+            day = [c for start, c in pair.minutes.items() if start >= time.time() - 86400]
+            high = max(c[1] for c in day) if day else pair.price
+            low = min(c[2] for c in day) if day else pair.price
+            volume = sum(c[4] for c in day)
+            result[pair.id] = {
+                'a': [f"{ask:.8f}", '1', '1.000'], 'b': [f"{bid:.8f}", '1', '1.000'],
+                'c': [f"{pair.price:.8f}", '1.00000000'], 'v': [f"{volume:.8f}"] * 2,
+                'p': [f"{pair.price:.8f}"] * 2, 't': [len(day), len(day)], 'l': [f"{low:.8f}"] * 2,
+                'h': [f"{high:.8f}"] * 2, 'o': f"{day[0][0] if day else pair.price:.8f}",
+            }
+        return result
+
+    def public_OHLC(self, params):
+        pair = self._pairs_param(params)[0]
+        since = params.get('since')
+        if since is not None:
+            since = float(since)
+            # ccxt sends nanoseconds, Kraken's docs say seconds
+            while since > 1e11:
+                since /= 1000
+        rows = pair.ohlc(int(params.get('interval', 1)), since)
+        candles = [[start, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{c:.8f}", f"{v:.8f}", 1]
+                   for start, o, h, l, c, v in rows]
+        return {pair.id: candles, 'last': rows[-1][0] if rows else 0}
+
+    # --- private endpoints ---
+
+    def private_BalanceEx(self, params):
+        return {asset_id: {'balance': f"{total:.8f}", 'hold_trade': f"{held:.8f}"}
+                for asset_id, (total, held) in self.balances.items()}
+
+    def private_Balance(self, params):
+        return {asset_id: f"{total:.8f}" for asset_id, (total, _) in self.balances.items()}
+
+    def private_AddOrder(self, params):
+        pair = self._pairs_param(params)[0]
+        if params.get('ordertype') != 'limit':
+            raise KrakenError('EGeneral:Invalid arguments:ordertype')
+        side = params.get('type')
+        try:
+            volume = float(params['volume'])
+            price = float(params['price'])
+        except (KeyError, ValueError):
+            raise KrakenError('EGeneral:Invalid arguments:volume') from None
+        if volume * price < 0.5:
+            raise KrakenError('EOrder:Cost minimum not met')
+
+        if side == 'buy':
+            needed = price * volume * (1 + self.taker_fee)
+            total, held = self.balances['USDT']
+            if total - held < needed:
+                raise KrakenError('EOrder:Insufficient funds')
+            self.balances['USDT'][1] += needed
+        else:
+            total, held = self.balances.get(pair.base_id, [0.0, 0.0])
+            if total - held < volume:
+                raise KrakenError('EOrder:Insufficient funds')
+            self.balances[pair.base_id][1] += volume
+        self._charge_order(pair, 1)
+
+        order = Order(pair, side, volume, price)
+        self.orders[order.txid] = order
+        self.stats['orders'] += 1
+
+        # Marketable limit orders take what's there at the touch, the rest rests on the book
+        bid, ask = self.bid_ask(pair)
+        if side == 'buy' and price >= ask:
+            self._fill(order, self._available(order, ask), ask, self.taker_fee)
+        elif side == 'sell' and price <= bid:
+            self._fill(order, self._available(order, bid), bid, self.taker_fee)
+        return {'descr': {'order': order.describe()['descr']['order']}, 'txid': [order.txid]}
+
+    def _available(self, order, price):
+        return min(order.remaining, self.liquidity / price) if self.liquidity else order.remaining
+
+    def private_CancelOrder(self, params):
+        order = self.orders.get(params.get('txid'))
+        if order is None or order.status != 'open':
+            raise KrakenError('EOrder:Unknown order')
+        age = time.time() - order.opened
+        penalty = next((cost for limit, cost in CANCEL_PENALTY if age < limit), 0)
+        self._charge_order(order.pair, penalty)
+        self._close(order, 'canceled', 'User requested')
+        self.stats['cancels'] += 1
+        return {'count': 1}
+
+    def private_OpenOrders(self, params):
+        return {'open': {o.txid: o.describe() for o in self.orders.values() if o.status == 'open'}}
+
+    def private_ClosedOrders(self, params):
+        start = float(params.get('start', 0) or 0)
+        closed = [o for o in self.orders.values() if o.status != 'open' and (o.closed or 0) >= start]
+        closed.sort(key=lambda o: o.closed, reverse=True)
+        return {'closed': {o.txid: o.describe() for o in closed[:50]}, 'count': len(closed)}
+
+    def private_QueryOrders(self, params):
+        ids = (params.get('txid') or '').split(',')
+        return {i: self.orders[i].describe() for i in ids if i in self.orders}
+
+    # --- HTTP ---
+
+    async def handle(self, request):
+        kind, method = request.match_info['kind'], request.match_info['method']
+        handler = getattr(self, f"{kind}_{method}", None)
+        self.stats['requests'][method] = self.stats['requests'].get(method, 0) + 1
+        if handler is None:
+            return web.json_response({'error': ['EGeneral:Unknown method']})
+
+        injected = await self._inject(lambda: web.json_response({'error': ['EService:Unavailable']}))
+        if injected is not None:
+            return injected
+
+        try:
+            if kind == 'private':
+                params = dict(await request.post())
+                self._check_auth(request, params)
+                self._charge_private(method)
+            else:
+                params = dict(request.query)
+                self._charge_public()
+            result = handler(params)
+        except KrakenError as e:
+            if 'Rate limit' in str(e) or 'Too many' in str(e):
+                self.stats['rate_limited'] += 1
+            return web.json_response({'error': [str(e)]})
+
+        await self._maybe_hang()
+        return web.json_response({'error': [], 'result': result})
+
+    async def _inject(self, unavailable):
+        """Injected latency, then maybe an injected error: a 502 or the venue's own `unavailable()` response"""
+        if self.latency_ms:
+            # Lognormal: most requests near latency_ms, a long tail of slow ones
+            await asyncio.sleep(self.random.lognormvariate(math.log(self.latency_ms), self.jitter) / 1000)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats['injected_errors'] += 1
+            if self.random.random() < 0.5:
+                return web.Response(status=502, text='Bad Gateway')
+            return unavailable()
+        return None
+
+    async def _maybe_hang(self):
+        if self.hang_rate and self.random.random() < self.hang_rate:
+            # The work is done (an order would be placed), the answer just never comes in time
+            self.stats['hung'] += 1
+            await asyncio.sleep(self.hang_seconds)
+
+    def _check_auth(self, request, params):
+        key = request.headers.get('API-Key')
+        if not key or not request.headers.get('API-Sign'):
+            raise KrakenError('EAPI:Invalid key')
+        try:
+            nonce = int(params.get('nonce', 0))
+        except ValueError:
+            nonce = 0
+        if nonce <= self.nonces.get(key, 0):
+            self.stats['invalid_nonce'] += 1
+            raise KrakenError('EAPI:Invalid nonce')
+        self.nonces[key] = nonce
+
+    async def handle_stats(self, request):
+        return web.json_response({
+            **self.stats,
+            'api_counter': round(self.api_counter, 2),
+            'order_counters': {k: round(v, 2) for k, v in self.order_counters.items()},
+            'open_orders': sum(1 for o in self.orders.values() if o.status == 'open'),
+            'prices': {p.symbol: p.price for p in self.pairs.values()},
+        })
+
+    async def _ticker_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            self.tick()
+
+    def add_routes(self, router):
+        router.add_route('*', '/0/{kind:public|private}/{method}', self.handle)
+
+    def app(self):
+        application = web.Application()
+        application.router.add_get('/sim/stats', self.handle_stats)
+        self.add_routes(application.router)
+
+        async def start_ticker(app):
+            app['ticker'] = asyncio.ensure_future(self._ticker_loop())
+
+        async def stop_ticker(app):
+            app['ticker'].cancel()
+        application.on_startup.append(start_ticker)
+        application.on_cleanup.append(stop_ticker)
+        return application
+
+
+class CoinbaseError(Exception):
+    """An error answered as Coinbase's {"error", "message"} body with an HTTP status"""
+
+    def __init__(self, status, error, message):
+        super().__init__(message)
+        self.status = status
+        self.error = error
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class SimulatedCoinbase(SimulatedKraken):
+    """The same market, orders and balances, served over the Coinbase Advanced Trade API.
+
+    Only the routes ccxt.coinbase calls for the bot with its default options: the currencies and
+    products for load_markets, v2 accounts for fetch_balance, the v3 ticker, candles and
+    order endpoints. Requests are signed like Coinbase's legacy API keys (CB-ACCESS-* headers,
+    HMAC over timestamp + method + path + body) and rate limited per second like Advanced Trade.
+    Like the real v2 accounts, balances are totals: ccxt reports funds on hold as free.
+    """
+
+    name = 'Coinbase'
+
+    def __init__(self, symbols=('DOGE/USDT',), **kwargs):
+        super().__init__(symbols, **kwargs)
+        for pair in self.pairs.values():
+            pair.id = pair.symbol.replace('/', '-')
+        self.by_id = {p.id: p for p in self.pairs.values()}
+        self.codes = {asset_id: code for code, (asset_id, _, _) in ASSETS.items()}
+        self.tokens = dict(COINBASE_LIMITS)
+
+    def _decay(self):
+        elapsed = time.monotonic() - self._counters_at
+        super()._decay()
+        for kind, limit in COINBASE_LIMITS.items():
+            self.tokens[kind] = min(limit, self.tokens[kind] + elapsed * limit)
+
+    def _take(self, kind):
+        if not self.rate_limits:
+            return
+        self._decay()
+        if self.tokens[kind] < 1:
+            raise CoinbaseError(429, 'rate_limit_exceeded', 'Too many requests')
+        self.tokens[kind] -= 1
+
+    def _pair(self, product_id):
+        pair = self.by_id.get(product_id)
+        if pair is None:
+            raise CoinbaseError(404, 'NOT_FOUND', f"ProductID {product_id} could not be found")
+        return pair
+
+    def _describe(self, order):
+        status = {'open': 'OPEN', 'closed': 'FILLED'}.get(order.status, 'CANCELLED')
+        return {
+            'order_id': order.txid, 'product_id': order.pair.id, 'user_id': 'sim-user',
+            'order_configuration': {'limit_limit_gtc': {
+                'base_size': f"{order.volume:.8f}", 'limit_price': f"{order.price:.8f}", 'post_only': False}},
+            'side': order.side.upper(), 'client_order_id': order.client_id, 'status': status,
+            'time_in_force': 'GOOD_UNTIL_CANCELLED', 'created_time': _iso(order.opened),
+            'completion_percentage': f"{order.filled / order.volume * 100:.2f}",
+            'filled_size': f"{order.filled:.8f}", 'filled_value': f"{order.cost:.8f}",
+            'average_filled_price': f"{order.cost / order.filled if order.filled else 0:.8f}",
+            'number_of_fills': '1' if order.filled else '0', 'total_fees': f"{order.fee:.8f}",
+            'order_type': 'LIMIT', 'product_type': 'SPOT', 'pending_cancel': False, 'settled': order.status != 'open',
+        }
+
+    # --- public (v2) ---
+
+    def get_currencies(self, request, params):
+        return {'data': [{'id': 'USD', 'name': 'US Dollar', 'min_size': '0.01'}]}
+
+    def get_crypto_currencies(self, request, params):
+        return {'data': [{'asset_id': asset_id, 'code': code, 'name': code, 'exponent': 8, 'type': 'crypto'}
+                         for code, (asset_id, _, _) in ASSETS.items()]}
+
+    def get_exchange_rates(self, request, params):
+        rates = {pair.symbol.split('/')[0]: f"{1 / pair.price:.8f}" for pair in self.pairs.values()}
+        return {'data': {'currency': 'USDT', 'rates': {'USDT': '1', **rates}}}
+
+    # --- private ---
+
+    def get_accounts(self, request, params):
+        return {'pagination': {'limit': 100, 'next_uri': None}, 'data': [
+            {'id': asset_id, 'name': f"{self.codes.get(asset_id, asset_id)} Wallet", 'type': 'wallet',
+             'balance': {'amount': f"{total:.8f}", 'currency': self.codes.get(asset_id, asset_id)}}
+            for asset_id, (total, _) in self.balances.items()]}
+
+    def get_products(self, request, params):
+        wanted = request.query.getall('product_ids', [])
+        products = []
+        for pair in self.pairs.values():
+            if wanted and pair.id not in wanted:
+                continue
+            base = pair.symbol.split('/')[0]
+            products.append({
+                'product_id': pair.id, 'price': f"{pair.price:.8f}", 'price_percentage_change_24h': '0',
+                'base_increment': '0.00000001', 'quote_increment': '0.00000001', 'quote_min_size': '1',
+                'quote_max_size': '10000000', 'base_min_size': '0.00000001', 'base_max_size': '100000000',
+                'base_name': base, 'quote_name': 'Tether', 'status': 'online', 'trading_disabled': False,
+                'product_type': 'SPOT', 'base_currency_id': base, 'quote_currency_id': 'USDT',
+            })
+        return {'products': products, 'num_products': len(products)}
+
+    def get_transaction_summary(self, request, params):
+        return {'total_volume': 0, 'total_fees': 0, 'fee_tier': {
+            'pricing_tier': 'sim', 'taker_fee_rate': str(self.taker_fee), 'maker_fee_rate': str(self.maker_fee)}}
+
+    def get_ticker(self, request, params):
+        pair = self._pair(request.match_info['product_id'])
+        bid, ask = self.bid_ask(pair)
+        trade = {'trade_id': str(self.stats['fills']), 'product_id': pair.id, 'price': f"{pair.price:.8f}",
+                 'size': '1', 'time': _iso(time.time()), 'side': 'BUY', 'bid': '', 'ask': ''}
+        return {'trades': [trade], 'best_bid': f"{bid:.8f}", 'best_ask': f"{ask:.8f}"}
+
+    def get_candles(self, request, params):
+        pair = self._pair(request.match_info['product_id'])
+        minutes = GRANULARITIES.get(params.get('granularity'))
+        if minutes is None:
+            raise CoinbaseError(400, 'INVALID_ARGUMENT', 'Unsupported granularity')
+        try:
+            start, end = int(params['start']), int(params['end'])
+        except (KeyError, ValueError):
+            raise CoinbaseError(400, 'INVALID_ARGUMENT', 'start and end are required') from None
+        if (end - start) // (minutes * 60) > 300:
+            raise CoinbaseError(400, 'INVALID_ARGUMENT', 'number of candles requested should be less than 300')
+        rows = [row for row in pair.ohlc(minutes, start, len(pair.minutes) + 1) if row[0] < end]
+        # Newest first, like Coinbase
+        return {'candles': [{'start': str(start), 'low': f"{l:.8f}", 'high': f"{h:.8f}", 'open': f"{o:.8f}",
+                             'close': f"{c:.8f}", 'volume': f"{v:.8f}"} for start, o, h, l, c, v in reversed(rows)]}
+
+    def get_orders(self, request, params):
+        statuses = request.query.getall('order_status', [])
+        product_id = params.get('product_id')
+        since = params.get('start_date')
+        since = datetime.fromisoformat(since.replace('Z', '+00:00')).timestamp() if since else 0
+        orders = [self._describe(o) for o in sorted(self.orders.values(), key=lambda o: o.opened, reverse=True)
+                  if (not product_id or o.pair.id == product_id) and o.opened >= since]
+        orders = [o for o in orders if not statuses or o['status'] in statuses][:int(params.get('limit', 100))]
+        return {'orders': orders, 'sequence': '0', 'has_next': False, 'cursor': ''}
+
+    def get_order(self, request, params):
+        order = self.orders.get(request.match_info['order_id'])
+        if order is None:
+            raise CoinbaseError(404, 'unknown', 'order with this orderID was not found')
+        return {'order': self._describe(order)}
+
+    def post_order(self, request, params):
+        pair = self._pair(params.get('product_id'))
+        side = (params.get('side') or '').lower()
+        config = (params.get('order_configuration') or {}).get('limit_limit_gtc')
+        if config is None or side not in ('buy', 'sell'):
+            return self._order_failed('UNSUPPORTED_ORDER_CONFIGURATION', 'Only limit GTC orders are simulated')
+        try:
+            volume = float(config['base_size'])
+            price = float(config['limit_price'])
+        except (KeyError, ValueError):
+            return self._order_failed('INVALID_SIZE', 'Invalid base_size or limit_price')
+        if volume * price < 1:
+            return self._order_failed('INVALID_LIMIT_PRICE', 'Order value is below the minimum')
+        bid, ask = self.bid_ask(pair)
+        if config.get('post_only') and (price >= ask if side == 'buy' else price <= bid):
+            return self._order_failed('INVALID_LIMIT_PRICE_POST_ONLY', 'Post-only order would cross the book')
+
+        asset_id = 'USDT' if side == 'buy' else pair.base_id
+        needed = price * volume * (1 + self.taker_fee) if side == 'buy' else volume
+        total, held = self.balances.setdefault(asset_id, [0.0, 0.0])
+        if total - held < needed:
+            return self._order_failed('INSUFFICIENT_FUND', 'Insufficient balance in source account')
+        self.balances[asset_id][1] += needed
+
+        order = Order(pair, side, volume, price)
+        order.txid = str(uuid.uuid4())
+        order.client_id = params.get('client_order_id')
+        self.orders[order.txid] = order
+        self.stats['orders'] += 1
+        if side == 'buy' and price >= ask:
+            self._fill(order, self._available(order, ask), ask, self.taker_fee)
+        elif side == 'sell' and price <= bid:
+            self._fill(order, self._available(order, bid), bid, self.taker_fee)
+        return {'success': True, 'order_id': order.txid, 'success_response': {
+            'order_id': order.txid, 'product_id': pair.id, 'side': side.upper(), 'client_order_id': order.client_id}}
+
+    def _order_failed(self, error, message):
+        # Coinbase answers a rejected order with a 200
+        return {'success': False, 'failure_reason': 'UNKNOWN_FAILURE_REASON',
+                'error_response': {'error': error, 'message': message, 'error_details': message}}
+
+    def post_batch_cancel(self, request, params):
+        results = []
+        for order_id in params.get('order_ids') or []:
+            order = self.orders.get(order_id)
+            if order is None or order.status != 'open':
+                results.append({'success': False, 'failure_reason': 'UNKNOWN_CANCEL_ORDER', 'order_id': order_id})
+                continue
+            self._close(order, 'canceled', 'User requested')
+            self.stats['cancels'] += 1
+            results.append({'success': True, 'failure_reason': 'UNKNOWN_CANCEL_FAILURE_REASON', 'order_id': order_id})
+        return {'results': results}
+
+    # --- HTTP ---
+
+    def route(self, handler, private):
+        async def handle(request):
+            self.stats['requests'][handler.__name__] = self.stats['requests'].get(handler.__name__, 0) + 1
+            injected = await self._inject(lambda: web.Response(status=503, text='Service Unavailable'))
+            if injected is not None:
+                return injected
+            try:
+                body = await request.text()
+                if private:
+                    self._check_auth(request, body)
+                self._take('private' if private else 'public')
+                params = json.loads(body) if body else dict(request.query)
+                result = handler(request, params)
+            except CoinbaseError as e:
+                if e.status == 429:
+                    self.stats['rate_limited'] += 1
+                return web.json_response({'error': e.error, 'error_details': str(e), 'message': str(e)},
+                                         status=e.status)
+            await self._maybe_hang()
+            return web.json_response(result)
+        return handle
+
+    def _check_auth(self, request, body):
+        key, signature = request.headers.get('CB-ACCESS-KEY'), request.headers.get('CB-ACCESS-SIGN')
+        if key != CREDENTIALS[0] or not signature:
+            raise CoinbaseError(401, 'authentication_error', 'invalid api key')
+        try:
+            timestamp = int(request.headers.get('CB-ACCESS-TIMESTAMP', ''))
+        except ValueError:
+            timestamp = 0
+        if abs(time.time() - timestamp) > 30:
+            self.stats['invalid_nonce'] += 1
+            raise CoinbaseError(401, 'authentication_error', 'request timestamp expired')
+        # v2 signs the query string too, v3 only the path
+        path = request.raw_path if request.path.startswith('/v2/') else request.raw_path.split('?')[0]
+        payload = f"{timestamp}{request.method}{path}{body}"
+        expected = hmac.new(CREDENTIALS[1].encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            raise CoinbaseError(401, 'authentication_error', 'invalid signature')
+
+    def add_routes(self, router):
+        routes = [
+            ('GET', '/v2/currencies', self.get_currencies, False),
+            ('GET', '/v2/currencies/crypto', self.get_crypto_currencies, False),
+            ('GET', '/v2/exchange-rates', self.get_exchange_rates, False),
+            ('GET', '/v2/accounts', self.get_accounts, True),
+            ('GET', '/api/v3/brokerage/products', self.get_products, True),
+            ('GET', '/api/v3/brokerage/transaction_summary', self.get_transaction_summary, True),
+            ('GET', '/api/v3/brokerage/products/{product_id}/ticker', self.get_ticker, True),
+            ('GET', '/api/v3/brokerage/products/{product_id}/candles', self.get_candles, True),
+            ('GET', '/api/v3/brokerage/orders/historical/batch', self.get_orders, True),
+            ('GET', '/api/v3/brokerage/orders/historical/{order_id}', self.get_order, True),
+            ('POST', '/api/v3/brokerage/orders', self.post_order, True),
+            ('POST', '/api/v3/brokerage/orders/batch_cancel', self.post_batch_cancel, True),
+        ]
+        for method, path, handler, private in routes:
+            router.add_route(method, path, self.route(handler, private))
+
+
+SIMULATORS = {'kraken': SimulatedKraken, 'coinbase': SimulatedCoinbase}
+
+
+async def _serve(sim, host, port):
+    runner = web.AppRunner(sim.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'n': len(ordered), 'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99), 'max': ordered[-1],
+            'mean': statistics.fmean(ordered)}
+
+
+def run_load(args):
+    """Drive real-mode RSITraders against the simulator and report latency percentiles per step"""
+    import tempfile
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ssrsi.exchanges import get_adapter
+    from ssrsi.trader import RSITrader
+
+    symbols = [s for s in ASSETS if s != 'USDT'][:args.traders]
+    sim = SIMULATORS[args.exchange]([f"{s}/USDT" for s in symbols], latency_ms=args.latency_ms, jitter=args.jitter,
+                          error_rate=args.error_rate, hang_rate=args.hang_rate, hang_seconds=args.hang_seconds,
+                          liquidity=args.liquidity, rate_limits=not args.no_rate_limits, tier=args.tier,
+                          volatility=args.volatility, seed=args.seed)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(_serve(sim, '127.0.0.1', args.port))
+    threading.Thread(target=loop.run_forever, name='simexchange', daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix='ssrsi-sim-')
+    adapter = get_adapter(args.exchange, *CREDENTIALS, config=client_config(
+        f"http://127.0.0.1:{args.port}", args.timeout_ms, args.client_rate_limit_ms, args.exchange))
+    adapter.log_file = f"{workdir}/sim.log"
+    traders = [RSITrader(adapter, symbol, paper_trading=False, settings={
+        'candle_db': ':memory:', 'trade_journal_dir': workdir, 'min_crypto_trade': 1e-6, 'min_usdt_trade': 1.0,
+    }) for symbol in symbols]
+    for trader in traders:
+        trader.order_timeout_minutes = args.stale_seconds / 60
+
+    timings = {'execute_trade': [], 'reconcile_orders': [], 'cancel_stale_orders': [], 'round': []}
+    outcomes = {'placed': 0, 'skipped': 0}
+    lock = threading.Lock()
+
+    def timed(name, fn, *fn_args):
+        started = time.perf_counter()
+        result = fn(*fn_args)
+        with lock:
+            timings[name].append(time.perf_counter() - started)
+        return result
+
+    def drive(trader):
+        for i in range(args.rounds):
+            started = time.perf_counter()
+            trader.snapshot.invalidate('price')
+            trader.snapshot.invalidate('balance')
+            trader.update_balances(reconcile=False)
+            price = trader.fetch_current_price()
+            side = 'buy' if i % 2 == 0 else 'sell'
+            amount = args.order_usdt if side == 'buy' else args.order_usdt / price if price else 0
+            placed = timed('execute_trade', trader.execute_trade, side, amount)
+            with lock:
+                outcomes['placed' if placed else 'skipped'] += 1
+            timed('reconcile_orders', trader.reconcile_orders)
+            timed('cancel_stale_orders', trader.check_and_cancel_stale_orders)
+            with lock:
+                timings['round'].append(time.perf_counter() - started)
+
+    logging.info(f"Load test on {sim.name}: {len(traders)} trader(s) x {args.rounds} rounds, "
+                 f"concurrency {args.concurrency}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(drive, traders))
+    elapsed = time.perf_counter() - started
+
+    stats = asyncio.run_coroutine_threadsafe(sim.handle_stats(None), loop).result(5)
+    report = {
+        'seconds': elapsed,
+        'orders_per_second': outcomes['placed'] / elapsed if elapsed else 0.0,
+        'outcomes': outcomes,
+        'latency': {name: percentiles(samples) for name, samples in timings.items()},
+        'server': json.loads(stats.text),
+        'client': {'rate_limit': adapter.limiter.stats(), 'resilience': adapter.resilience.stats()},
+    }
+
+    print(f"\n{outcomes['placed']} orders placed ({outcomes['skipped']} skipped) in {elapsed:.1f}s "
+          f"= {report['orders_per_second']:.2f} orders/s")
+    print(f"{'step':<22} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, p in report['latency'].items():
+        if p:
+            print(f"{name:<22} {p['n']:>5} {p['p50'] * 1000:>9.1f} {p['p95'] * 1000:>9.1f} "
+                  f"{p['p99'] * 1000:>9.1f} {p['max'] * 1000:>9.1f}")
+    server_stats = report['server']
+    print(f"server: {server_stats['orders']} orders, {server_stats['fills']} fills, {server_stats['cancels']} cancels, "
+          f"{server_stats['injected_errors']} injected errors, {server_stats['hung']} hung, "
+          f"{server_stats['rate_limited']} rate limited, {server_stats['invalid_nonce']} invalid nonces")
+    print(f"client: {report['client']['resilience']['retries']} retries, "
+          f"exchange status {report['client']['resilience']['status']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    asyncio.run_coroutine_threadsafe(server.cleanup(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated Kraken (or Coinbase) REST exchange for offline testing')
+    parser.add_argument('--exchange', choices=sorted(SIMULATORS), default='kraken', help='API to speak')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--symbols', default='DOGE/USDT', help='Comma separated pairs to list')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Median injected latency per request')
+    parser.add_argument('--jitter', type=float, default=0.5, help='Lognormal sigma of the latency (tail length)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with an error')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='Share of requests that hang after doing their work')
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    parser.add_argument('--liquidity', type=float, help='USDT that can fill per pair per tick (default unlimited)')
+    parser.add_argument('--volatility', type=float, default=0.0008, help='Price move per tick (std dev)')
+    parser.add_argument('--tier', choices=sorted(TIERS), default='starter', help='Kraken rate limit tier')
+    parser.add_argument('--no-rate-limits', action='store_true')
+    parser.add_argument('--seed', type=int)
+    load = parser.add_argument_group('load test')
+    load.add_argument('--load', action='store_true', help='Run the load test against an in-process server and exit')
+    load.add_argument('--traders', type=int, default=1, help=f"Symbols traded at once (max {len(ASSETS) - 1})")
+    load.add_argument('--rounds', type=int, default=20, help='Trade + reconcile + cancel rounds per trader')
+    load.add_argument('--concurrency', type=int, default=1,
+                      help='Traders driven in parallel (1 = one after another, like the runner)')
+    load.add_argument('--order-usdt', type=float, default=20.0)
+    load.add_argument('--stale-seconds', type=float, default=2.0, help='Order timeout used by the cancel step')
+    load.add_argument('--timeout-ms', type=int, default=10000, help='ccxt client timeout')
+    load.add_argument('--client-rate-limit-ms', type=int,
+                      help="ccxt's milliseconds per cost unit (default: ccxt's 1000 for Kraken)")
+    load.add_argument('--json', help='Write the load test report here')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING if args.load else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.load:
+        run_load(args)
+        return
+
+    sim = SIMULATORS[args.exchange](args.symbols.split(','), latency_ms=args.latency_ms, jitter=args.jitter,
+                          error_rate=args.error_rate, hang_rate=args.hang_rate, hang_seconds=args.hang_seconds,
+                          liquidity=args.liquidity, rate_limits=not args.no_rate_limits, tier=args.tier,
+                          volatility=args.volatility, seed=args.seed)
+    main_loop = asyncio.new_event_loop()
+    main_loop.run_until_complete(_serve(sim, args.host, args.port))
+    logging.info(f"Simulated {sim.name} on http://{args.host}:{args.port} (stats at /sim/stats)")
+    main_loop.run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Short-lived cache of market state shared by the trade loop and the dashboard"""
+import threading
+import time
+
+
+class MarketSnapshot:
+    """Holds price, balances and the RSI reading for one cycle so every consumer reuses them.
+
+    get() returns the cached value while it is younger than the TTL and only calls the
+    loader on a miss. Loaders that return None (failed fetch) are not cached.
+    """
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._values = {}  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key, loader=None, max_age=None):
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None and time.time() - entry[1] <= max_age:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        if loader is None:
+            return None
+        value = loader()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._values[key] = (value, time.time())
+
+    def peek(self, key):
+        """Cached value whatever its age, without touching the hit/miss counters"""
+        entry = self._values.get(key)
+        return entry[0] if entry is not None else None
+
+    def age(self, key):
+        entry = self._values.get(key)
+        return time.time() - entry[1] if entry is not None else None
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or everything when called without arguments"""
+        with self._lock:
+            if not keys:
+                self._values.clear()
+            for key in keys:
+                self._values.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            now = time.time()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'ttl': self.ttl,
+                'age_seconds': {key: round(now - stored_at, 2) for key, (_, stored_at) in self._values.items()},
+            }
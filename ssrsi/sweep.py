@@ -0,0 +1,153 @@
+"""Parallel parameter sweep over the backtester.
+
+    python -m ssrsi.sweep --db candles.sqlite --rsi-period 2:14 --rsi-low 15:35:5 --rsi-high 65:90:5 \\
+        --price-adjustment 0.002:0.01:0.002 --top 20
+
+Ranges are start:stop[:step] with stop included, or a comma list. Candles are loaded once and put in
+shared memory, workers attach to it instead of receiving a pickled copy per task.
+"""
+import argparse
+import itertools
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from ssrsi.backtest import StrategyParams, add_data_arguments, load_candles, rsi_series, run_backtest
+
+SWEEP_FIELDS = ('rsi_period', 'rsi_low', 'rsi_high', 'price_adjustment')
+
+# Worker-side state, set by _attach() once per process
+_candles = None
+_shm = None
+_rsi_cache = {}
+_settings = {}
+
+
+def parse_range(text, kind=float):
+    """'2:14' -> 2..14, '15:35:5' -> 15,20..35, '0.002,0.004' -> list"""
+    if ',' in text:
+        return [kind(v) for v in text.split(',')]
+    parts = [kind(v) for v in text.split(':')]
+    if len(parts) == 1:
+        return parts
+    start, stop = parts[0], parts[1]
+    step = parts[2] if len(parts) > 2 else kind(1)
+    if step <= 0:
+        raise ValueError(f"Range step must be positive: {text}")
+    count = int(round((stop - start) / step)) + 1
+    return [kind(start + i * step) if kind is int else round(start + i * step, 10) for i in range(count)]
+
+
+def _attach(shm_name, shape, settings):
+    global _candles, _shm, _settings
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _candles = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _settings = settings
+
+
+def _run_chunk(combos):
+    """Backtest a chunk of combos that share one rsi_period, so RSI is computed once per chunk"""
+    results = []
+    for combo in combos:
+        params = StrategyParams(**_settings['base'], **combo)
+        key = (params.rsi_period, params.rsi_method)
+        if key not in _rsi_cache:
+            _rsi_cache.clear()
+            _rsi_cache[key] = rsi_series(_candles[:, 4], params.rsi_period, params.rsi_method)
+        summary = run_backtest(_candles, params, _settings['usdt'], _settings['crypto'],
+                               rsi=_rsi_cache[key]).summary()
+        results.append({**combo, **summary})
+    return results
+
+
+def build_grid(ranges):
+    names = list(ranges)
+    grid = []
+    for values in itertools.product(*(ranges[name] for name in names)):
+        combo = dict(zip(names, values))
+        if combo.get('rsi_low', 0) >= combo.get('rsi_high', 100):
+            continue
+        grid.append(combo)
+    return grid
+
+
+def chunk_grid(grid, chunk_size):
+    """Group by rsi_period first so each worker reuses its RSI series across the chunk"""
+    grid = sorted(grid, key=lambda c: c['rsi_period'])
+    chunks = []
+    for _, group in itertools.groupby(grid, key=lambda c: c['rsi_period']):
+        group = list(group)
+        chunks.extend(group[i:i + chunk_size] for i in range(0, len(group), chunk_size))
+    return chunks
+
+
+def sweep(candles, ranges, base=None, usdt=50.0, crypto=0.0, processes=None, chunk_size=64, rank_by='final_equity'):
+    candles = np.ascontiguousarray(candles, dtype=np.float64)
+    grid = build_grid(ranges)
+    settings = {'base': base or {}, 'usdt': usdt, 'crypto': crypto}
+
+    shm = shared_memory.SharedMemory(create=True, size=max(candles.nbytes, 1))
+    try:
+        np.ndarray(candles.shape, dtype=np.float64, buffer=shm.buf)[:] = candles
+        with Pool(processes, initializer=_attach, initargs=(shm.name, candles.shape, settings)) as pool:
+            results = [row for chunk in pool.imap_unordered(_run_chunk, chunk_grid(grid, chunk_size)) for row in chunk]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results.sort(key=lambda row: row[rank_by], reverse=rank_by != 'max_drawdown_percent')
+    return results
+
+
+def print_table(rows, columns):
+    widths = {c: max(len(c), *(len(_fmt(r[c])) for r in rows)) for c in columns}
+    print('  '.join(c.rjust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(_fmt(row[c]).rjust(widths[c]) for c in columns))
+
+
+def _fmt(value):
+    return f"{value:.4f}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep RSI strategy parameters over stored candles')
+    add_data_arguments(parser)
+    parser.add_argument('--rsi-period', default='3')
+    parser.add_argument('--rsi-low', default='25')
+    parser.add_argument('--rsi-high', default='85')
+    parser.add_argument('--price-adjustment', default='0.004')
+    parser.add_argument('--rsi-method', choices=('sma', 'wilder'), default='sma')
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--rank-by', default='final_equity',
+                        choices=('final_equity', 'return_percent', 'max_drawdown_percent', 'total_fees'))
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    candles = load_candles(args)
+    if len(candles) == 0:
+        parser.error('no candles found')
+
+    ranges = {
+        'rsi_period': parse_range(args.rsi_period, int),
+        'rsi_low': parse_range(args.rsi_low),
+        'rsi_high': parse_range(args.rsi_high),
+        'price_adjustment': parse_range(args.price_adjustment),
+    }
+    started = time.perf_counter()
+    results = sweep(candles, ranges, {'rsi_method': args.rsi_method}, args.usdt, args.crypto,
+                    args.processes, args.chunk_size, args.rank_by)
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(results)} combinations over {len(candles)} candles in {elapsed:.1f}s "
+          f"on {args.processes} processes\n")
+    if results:
+        print_table(results[:args.top], [*SWEEP_FIELDS, 'buys', 'sells', 'final_equity', 'return_percent',
+                                         'max_drawdown_percent', 'total_fees'])
+
+
+if __name__ == '__main__':
+    main()
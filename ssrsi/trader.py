@@ -0,0 +1,579 @@
+"""The RSI trader core, shared by every exchange through ssrsi.exchanges adapters"""
+import ccxt
+import time
+from datetime import datetime, timedelta
+import logging
+
+from ssrsi import metrics
+from ssrsi.candles import CandleCache
+from ssrsi.downsample import MinMaxLevels
+from ssrsi.history import TradeHistory
+from ssrsi.journal import TradeJournal, journal_path, migrate_logs
+from ssrsi.paperfills import PaperBook
+from ssrsi.rsi import StreamingRSI
+from ssrsi.scheduler import CandleScheduler
+from ssrsi.series import FIELDS, ChartSeries
+from ssrsi.snapshot import MarketSnapshot
+
+
+class RSITrader:
+    def __init__(self, adapter, crypto_symbol='DOGE', paper_trading=False, settings=None):
+        # ********** USER CONFIGURATION SECTION **********
+        self.paper_trading = paper_trading  # Set to True for testing, False for real trading, see the exchange scripts (SSRsi-*.py)
+        self.crypto_symbol = crypto_symbol  # Trading pair symbol (e.g., 'DOGE', 'BTC', 'ETH'), see the exchange scripts (SSRsi-*.py)
+
+        # RSI Parameters
+        self.rsi_period = 3  # Period for RSI calculation
+        self.rsi_low = 25  # Buy when RSI below this value
+        self.rsi_high = 85  # Sell when RSI above this value
+        self.interval = '5m'  # Timeframe for OHLCV data
+        self.candle_grace_seconds = 5  # The loop runs this long after each candle closes (exchanges publish it a bit late)
+        self.order_check_seconds = 60  # Between candles only resting orders are checked, this often (None = never)
+        self.rsi_method = 'sma'  # 'sma' (simple average, original behaviour) or 'wilder' (smoothed, like most charts)
+        self.candle_db = 'candles.sqlite'  # Local candle cache, only new candles are downloaded each cycle
+        self.use_price_stream = False  # True = websocket ticker/candle pushes (ccxt.pro), REST polling becomes the fallback
+        self.price_stream_url = None  # Override the websocket URL, e.g. 'ws://127.0.0.1:8765' for python -m ssrsi.fakews
+        self.snapshot_ttl = 30  # Seconds a fetched price/balance is reused by the trade loop, trades and the dashboard
+        self.trade_journal_dir = 'trades'  # Trades are recorded here (one small file per exchange/pair) instead of scraped from the log
+
+        # Trade Parameters
+        self.position_percentage = 97  # Percentage of balance to use per trade
+        self.price_adjustment = 0.004  # Price adjustment for limit orders (0.4%)
+
+        # Minimum trade amounts
+        self.min_usdt_trade = 5.0  # Minimum USDT amount per trade
+        self.min_crypto_trade = 15  # Minimum crypto amount per trade
+
+        # Risk Management
+        self.max_usdt_loss_percent = 90.0  # Max allowed loss percentage before stopping
+
+        # Exchange Fees (defaults come from the exchange adapter, override here if your tier differs)
+        self.maker_fee = adapter.maker_fee
+        self.taker_fee = adapter.taker_fee
+
+        # Order Management
+        self.order_timeout_minutes = 30  # Cancel orders older than this
+        # ********** END USER CONFIGURATION **********
+
+        # Per-trader overrides, e.g. settings={'rsi_low': 30} for one symbol of a multi-symbol run
+        for name, value in (settings or {}).items():
+            if not hasattr(self, name):
+                raise ValueError(f"Unknown trader setting '{name}'")
+            setattr(self, name, value)
+
+        # Traders on the same adapter share one client (and its rate limiter)
+        self.adapter = adapter
+        self.exchange = adapter.exchange
+
+        self.symbol = adapter.market_symbol(crypto_symbol)
+        self.display_symbol = crypto_symbol
+        self.recent_trades = 100  # How many past trades are kept in memory, older ones are only in the journal
+        self.trades = TradeHistory(self.recent_trades)
+        self.journal = None
+        self.log_file = adapter.log_file
+        self.trading_enabled = True
+        self.active_orders = {}
+
+        # Paper trading balances (only used when paper_trading=True)
+        self.current_usdt_balance = 50.0
+        self.current_crypto_balance = 61.18663155
+        self.held_usdt = self.held_crypto = 0.0  # Taken out of the paper balances by resting paper orders
+        self.total_fees_paid = 0.0
+        # Paper orders rest here until the market trades through them (ssrsi/paperfills.py)
+        self.paper_book = PaperBook(self.maker_fee, self.taker_fee)
+        self.paper_matched_until = None  # Candles before this timestamp were already matched
+
+        self.snapshot = MarketSnapshot(self.snapshot_ttl)
+        self.update_balances()
+        self.initial_usdt_balance = self.current_usdt_balance
+        self.initial_crypto_balance = self.current_crypto_balance
+        self.initial_usdt_only_balance = self.current_usdt_balance if self.current_usdt_balance > 0.0 else 0.0
+
+        self.rsi_engine = StreamingRSI(self.rsi_period, self.rsi_method)
+        self.candles = CandleCache(self.candle_db, adapter.name, self.symbol, self.interval)
+        self.price_feed = None
+        if self.use_price_stream and adapter.supports('streaming'):
+            # ccxt.pro pulls in aiohttp and friends, so it is only imported when streaming is on
+            from ssrsi.feed import StreamingPriceFeed
+            self.price_feed = StreamingPriceFeed(adapter.name, self.symbol, self.interval,
+                                                 ws_url=self.price_stream_url, on_candles=self.candles.merge)
+            self.price_feed.start()
+        self.chart = ChartSeries(8064)  # Price/RSI points on the dashboard (4 weeks of 5m candles), see max_data_points
+        self.chart_levels = MinMaxLevels(self.chart.capacity)  # Coarser copies, for long windows
+
+        self.load_previous_trades()
+
+    @property
+    def max_data_points(self):
+        return self.chart.capacity
+
+    @max_data_points.setter
+    def max_data_points(self, count):
+        with self.chart.lock:
+            self.chart.resize(count)
+            self.chart_levels = MinMaxLevels(count)
+            self.chart_levels.extend(self.chart.last())
+
+    def set_order_timeout(self, minutes):
+        """Set the order timeout in minutes"""
+        self.order_timeout_minutes = minutes
+        logging.info(f"Order timeout set to {minutes} minutes")
+
+    def check_and_cancel_stale_orders(self):
+        """Check for and cancel orders that have been open too long"""
+        for order_id in self.stale_orders():
+            if self.paper_trading:
+                self.cancel_paper_order(order_id)
+                continue
+            try:
+                self.exchange.cancel_order(order_id, self.symbol)
+                self.order_cancelled(order_id)
+            except Exception as e:
+                logging.error(f"Failed to cancel order {order_id}: {e}")
+
+    def stale_orders(self):
+        cutoff = datetime.now() - timedelta(minutes=self.order_timeout_minutes)
+        return [order_id for order_id, info in self.active_orders.items() if info['time'] < cutoff]
+
+    def order_cancelled(self, order_id):
+        info = self.active_orders.pop(order_id)
+        partial = f" (partially filled {info['filled']:.8f})" if info.get('filled') else ''
+        logging.info(f"Cancelled stale {info['side']} order: {order_id}{partial}")
+
+    def load_previous_trades(self):
+        try:
+            self.journal = TradeJournal(journal_path(self.trade_journal_dir, self.adapter.name, self.symbol))
+            if not self.journal.existed:
+                # First start with a journal: pick up the trades the old versions only wrote to the log
+                migrate_logs(self.journal, self.log_file, self.display_symbol)
+
+            self.trades = TradeHistory(self.recent_trades, self.journal, self.paper_trading)
+        except Exception as e:
+            logging.error(f"Error loading trades: {e}")
+
+    def record_trade(self, side, price, amount, fee=0.0):
+        """Keep a trade in memory and append it to the journal"""
+        self.trades.append(datetime.now(), side, price, amount, fee, self.paper_trading)
+
+    @property
+    def last_buy_price(self):
+        last_buy = self.trades.last('buy')
+        return last_buy.price if last_buy else None
+
+    def reset_initial_balance(self):
+        self.snapshot.invalidate('balance')
+        self.update_balances()
+        self.initial_usdt_only_balance = self.current_usdt_balance + self.held_usdt
+        logging.info(f"Reset initial balance to: {self.initial_usdt_only_balance:.2f}")
+
+    def check_profit_condition(self):
+        if self.initial_usdt_only_balance == 0:
+            return True
+
+        current_value = self.portfolio_value(self.fetch_current_price())
+
+        loss_percent = ((self.initial_usdt_only_balance - current_value) /
+                        self.initial_usdt_only_balance * 100)
+
+        if loss_percent > self.max_usdt_loss_percent:
+            logging.warning(f"Loss threshold exceeded: {loss_percent:.2f}%")
+            return False
+        return True
+
+    def calculate_pnl(self):
+        # Dashboard only: any cached price will do, so page loads don't add exchange calls
+        current_price = self.fetch_current_price(max_age=float('inf'))
+        if current_price is None:
+            return 0.0, 0.0
+
+        current_value = self.portfolio_value(current_price)
+        initial_value = self.initial_usdt_only_balance if self.initial_usdt_only_balance > 0 else self.initial_usdt_balance
+
+        pnl_usdt = current_value - initial_value
+        pnl_percent = (pnl_usdt / initial_value * 100) if initial_value > 0 else 0.0
+        return pnl_usdt, pnl_percent
+
+    def portfolio_value(self, price):
+        """USDT plus the crypto at `price`, counting what resting paper orders hold"""
+        value = self.current_usdt_balance + self.held_usdt
+        crypto = self.current_crypto_balance + self.held_crypto
+        if crypto > 0 and price:
+            value += crypto * price
+        return value
+
+    def fetch_current_price(self, max_age=None):
+        # Streamed price is already in memory, only poll when the stream is off or stale
+        if self.price_feed:
+            price = self.price_feed.price()
+            if price is not None:
+                return price
+
+        # One ticker call per cycle, later callers in the same cycle get the cached price
+        return self.snapshot.get('price', self._poll_price, max_age)
+
+    def _poll_price(self):
+        # Retries with backoff (and failing fast during an outage) happen in ssrsi.resilience
+        try:
+            ticker = self.exchange.fetch_ticker(self.symbol)
+            return float(ticker['last']) if ticker and 'last' in ticker else None
+        except Exception as e:
+            logging.warning(f"Price fetch failed: {e}")
+            return None
+
+    def calculate_rsi(self, sync=True):
+        try:
+            # Only candles newer than the cached ones are downloaded, and none at all while
+            # the websocket feed is pushing candle updates into the cache without gaps.
+            # sync=False when the caller (the async engine) has already synced the cache.
+            if sync and (self.candles.needs_sync or not (self.price_feed and self.price_feed.candles_fresh())):
+                self.candles.sync(self.exchange)
+
+            # The engine already holds everything before its last candle, and the newest
+            # candle is still open, so it is only peeked at (same reading as a full recompute)
+            with metrics.rsi_seconds.time(self.display_symbol):
+                last = self.rsi_engine.last_timestamp
+                ohlcv = self.candles.since(last) if last is not None else None
+                if last is None or self.candles.has_gap(ohlcv, last):
+                    # Candles missing (the bot was down longer than sync pages back): RSI over the
+                    # gap would treat both sides as neighbours, so start again after it
+                    if last is not None:
+                        logging.warning(f"Gap in {self.display_symbol} candles after {last}, re-seeding RSI")
+                        self.rsi_engine.reset()
+                    ohlcv = self.candles.contiguous_tail()
+                if not ohlcv:
+                    return None
+                for candle in ohlcv[:-1]:
+                    self.rsi_engine.update(candle[4], candle[0])
+                return self.rsi_engine.peek(ohlcv[-1][4])
+        except Exception as e:
+            logging.error(f"RSI calculation failed: {e}")
+            return None
+
+    def update_balances(self, max_age=None, reconcile=True, fetch=True):
+        """fetch=False only reads the snapshot (the async engine fills it, a sync call would block its loop)"""
+        if self.paper_trading:
+            logging.info(f"PAPER BALANCES: {self.display_symbol}={self.current_crypto_balance:.8f}, "
+                         f"USDT={self.current_usdt_balance:.2f}")
+            return
+
+        try:
+            balance = self.snapshot.get('balance', self.exchange.fetch_balance if fetch else None, max_age)
+            if balance and 'free' in balance:
+                free = balance['free']
+                self.current_crypto_balance = float(free.get(self.adapter.balance_code(self.display_symbol), 0))
+                self.current_usdt_balance = float(free.get('USDT', 0))
+        except Exception as e:
+            logging.error(f"Balance update failed: {e}")
+
+        if reconcile:
+            self.reconcile_orders()
+
+    def reconcile_orders(self):
+        """Check every resting order in one go and keep track of (partial) fills"""
+        if not self.active_orders:
+            return
+        if self.paper_trading:
+            self.match_paper_orders(self.fetch_current_price())
+            return
+
+        since = int(min(o['time'] for o in self.active_orders.values()).timestamp() * 1000)
+        try:
+            orders = self.adapter.fetch_order_statuses(list(self.active_orders), self.symbol, since)
+        except Exception as e:
+            logging.warning(f"Could not check order statuses: {e}")
+            return
+        self.apply_order_statuses(orders)
+
+    def apply_order_statuses(self, orders):
+        """Update active_orders from {order_id: ccxt order}"""
+        for order_id, order in orders.items():
+            info = self.active_orders.get(order_id)
+            if info is None:
+                continue
+            filled = float(order.get('filled') or 0.0)
+            status = order.get('status')
+            if filled > info['filled']:
+                info['filled'] = filled
+                if status == 'open':
+                    logging.info(f"Order {order_id} partially filled: {filled:.8f} of {info['amount']:.8f} {self.display_symbol}")
+
+            if status == 'closed':
+                logging.info(f"Order {order_id} has been filled, removing from active orders")
+                del self.active_orders[order_id]
+            elif status in ('canceled', 'expired', 'rejected'):
+                logging.info(f"Order {order_id} is {status} (filled {filled:.8f} of {info['amount']:.8f}), removing from active orders")
+                del self.active_orders[order_id]
+
+    def execute_trade(self, side: str, amount_to_use: float) -> bool:
+        plan = self.plan_trade(side, amount_to_use)
+        if plan is None:
+            return False
+
+        if self.paper_trading:
+            self.place_paper_order(plan)
+            return True
+
+        logging.info(
+            f"Attempting REAL {side.upper()}: {plan['quantity']:.8f} {self.display_symbol} at limit price {plan['price']:.5f}")
+        try:
+            order = self.exchange.create_order(
+                symbol=self.symbol,
+                type='limit',
+                side=side,
+                amount=plan['quantity'],
+                price=plan['price']
+            )
+        except Exception as e:
+            self.order_failed(plan, e)
+            return False
+        self.order_placed(plan, order)
+        return True
+
+    def plan_trade(self, side, amount_to_use, current_price=None):
+        """Work out the limit order for a signal, or None (with the reason logged) if there is nothing to do.
+
+        No orders are sent from here, so the sync loop and the async engine share the same rules.
+        The async engine passes the price it already has, otherwise it comes from fetch_current_price.
+        """
+        if not self.trading_enabled:
+            logging.info("Trading is disabled. Skipping trade.")
+            return None
+
+        if current_price is None:
+            current_price = self.fetch_current_price()
+        if not current_price:
+            logging.warning("Could not fetch current price. Skipping trade.")
+            return None
+
+        if side == 'buy':
+            usdt_to_spend_potential = amount_to_use * (self.position_percentage / 100)
+            if usdt_to_spend_potential < self.min_usdt_trade:
+                logging.info(
+                    f"Attempted buy: USDT to spend {usdt_to_spend_potential:.2f} is below minimum {self.min_usdt_trade:.2f} USDT. Skipping trade.")
+                return None
+
+            usdt_to_spend = min(usdt_to_spend_potential,
+                                self.current_usdt_balance) if not self.paper_trading else usdt_to_spend_potential
+            if usdt_to_spend < self.min_usdt_trade:
+                logging.info(
+                    f"Adjusted USDT to spend {usdt_to_spend:.2f} is below minimum {self.min_usdt_trade:.2f} USDT. Skipping trade.")
+                return None
+
+            target_price = current_price * (1 - self.price_adjustment)
+            return {'side': 'buy', 'quantity': usdt_to_spend / target_price, 'price': target_price, 'usdt': usdt_to_spend,
+                    'market_price': current_price}
+
+        crypto_to_sell_potential = amount_to_use * (self.position_percentage / 100)
+        if crypto_to_sell_potential < self.min_crypto_trade:
+            logging.info(
+                f"Attempted sell: Crypto to sell {crypto_to_sell_potential:.8f} is below minimum {self.min_crypto_trade:.8f}. Skipping trade.")
+            return None
+
+        quantity_to_sell = min(crypto_to_sell_potential,
+                               self.current_crypto_balance) if not self.paper_trading else crypto_to_sell_potential
+        if quantity_to_sell < self.min_crypto_trade:
+            logging.info(
+                f"Adjusted crypto to sell {quantity_to_sell:.8f} is below minimum {self.min_crypto_trade:.8f}. Skipping trade.")
+            return None
+
+        target_price = current_price * (1 + self.price_adjustment)
+        last_buy_price = self.last_buy_price
+        if last_buy_price is not None:
+            profit_buffer = last_buy_price * (1 + self.taker_fee * 2)
+            if target_price <= profit_buffer:
+                logging.info(
+                    f"SELL SIGNAL: Current sell target price ({target_price:.5f}) is not sufficiently higher than last buy price ({last_buy_price:.5f}). Skipping sell.")
+                return None
+
+        return {'side': 'sell', 'quantity': quantity_to_sell, 'price': target_price,
+                'usdt': quantity_to_sell * target_price, 'market_price': current_price}
+
+    def place_paper_order(self, plan):
+        """Rest a paper limit order, funds are held until it fills or goes stale like on the exchange"""
+        side, quantity, price = plan['side'], plan['quantity'], plan['price']
+        now = datetime.now()
+        now_ms = int(now.timestamp() * 1000)
+        # The loop runs a few seconds into a new candle, so a candle that only just opened still
+        # counts for the order (it can't have traded far in those seconds)
+        fill_from = now_ms
+        newest = self.candles.last_timestamp()
+        if newest is not None and now_ms - newest < self.candles.interval_ms // 10:
+            fill_from = newest
+        order, fill = self.paper_book.place(side, quantity, price, now_ms, plan['market_price'], fill_from)
+
+        if side == 'buy':
+            self.current_usdt_balance -= quantity * price
+            self.held_usdt += quantity * price
+        else:
+            self.current_crypto_balance -= quantity
+            self.held_crypto += quantity
+        if fill:
+            self.paper_filled(fill)
+            return
+        self.active_orders[order.id] = {'time': now, 'side': side, 'amount': quantity, 'price': price, 'filled': 0.0}
+        logging.info(f"PAPER {side.upper()} order placed: ID {order.id}, {quantity:.8f} {self.display_symbol} "
+                     f"at {price:.5f}")
+
+    def match_paper_orders(self, price=None):
+        """Fill resting paper orders the closed candles since the last check (then `price`) traded through"""
+        if not len(self.paper_book):
+            return
+        start = min(order.fill_from_ms for order in self.paper_book.orders.values())
+        if self.paper_matched_until is not None:
+            start = max(start, self.paper_matched_until)
+        # The newest candle is still open, its high/low aren't final yet
+        closed = self.candles.since(start)[:-1]
+        fills = []
+        for candle in closed:
+            fills.extend(self.paper_book.match(candle[0], candle[2], candle[3]))
+        if closed:
+            self.paper_matched_until = closed[-1][0] + 1
+        if price:
+            fills.extend(self.paper_book.match(int(datetime.now().timestamp() * 1000), price, price))
+        for fill in fills:
+            self.paper_filled(fill)
+
+    def paper_filled(self, fill):
+        order = fill.order
+        self.active_orders.pop(order.id, None)
+        usdt = order.quantity * fill.price
+        if order.side == 'buy':
+            # The hold was at the limit price, a taker fill can come in under it
+            self.held_usdt -= order.quantity * order.price
+            self.current_usdt_balance += order.quantity * order.price - usdt - fill.fee
+            self.current_crypto_balance += order.quantity
+            logging.info(f"PAPER BUY: {order.quantity:.8f} {self.display_symbol} at {fill.price:.5f} "
+                         f"for {usdt:.2f} USDT ({fill.liquidity}, fee {fill.fee:.4f})")
+        else:
+            self.held_crypto -= order.quantity
+            self.current_usdt_balance += usdt - fill.fee
+            logging.info(f"PAPER SELL: {order.quantity:.8f} {self.display_symbol} at {fill.price:.5f} "
+                         f"for {usdt - fill.fee:.2f} USDT ({fill.liquidity}, fee {fill.fee:.4f})")
+        self.total_fees_paid += fill.fee
+        self.record_trade(order.side, fill.price, order.quantity, fill.fee)
+
+    def cancel_paper_order(self, order_id):
+        order = self.paper_book.cancel(order_id)
+        if order is not None:
+            if order.side == 'buy':
+                self.held_usdt -= order.quantity * order.price
+                self.current_usdt_balance += order.quantity * order.price
+            else:
+                self.held_crypto -= order.quantity
+                self.current_crypto_balance += order.quantity
+        self.order_cancelled(order_id)
+
+    def order_placed(self, plan, order):
+        """Bookkeeping after the exchange accepted a real limit order"""
+        side, quantity, price = plan['side'], plan['quantity'], plan['price']
+        self.snapshot.invalidate('balance')
+        order_id = order.get('id')
+        if order_id:
+            self.active_orders[order_id] = {'time': datetime.now(), 'side': side,
+                                            'amount': quantity, 'price': price, 'filled': 0.0}
+            logging.info(
+                f"REAL {side.upper()} order placed: ID {order_id}, Quantity: {quantity:.8f} {self.display_symbol}, Price: {price:.5f}")
+        self.record_trade(side, price, quantity)
+
+    def order_failed(self, plan, error):
+        side = plan['side'].upper()
+        if isinstance(error, ccxt.InsufficientFunds):
+            logging.error(f"REAL {side} FAILED (Insufficient Funds): {error}")
+        elif isinstance(error, ccxt.NetworkError):
+            logging.error(f"REAL {side} FAILED (Network Error): {error}")
+        elif isinstance(error, ccxt.ExchangeError):
+            logging.error(f"REAL {side} FAILED (Exchange Error): {error}")
+        else:
+            logging.error(f"REAL {side} FAILED (Unexpected Error): {error}")
+
+    def chart_points_since(self, cursor, max_points=None, level=0):
+        """Chart points added after `cursor`, oldest first. Returns (points, new_cursor, reset).
+
+        reset=True means the client's cursor is unknown or too old and it gets the whole window.
+        With max_points a window longer than that comes from a downsampled level instead (points['level']),
+        whose last points['partial'] points are still changing and get replaced on the next call.
+        A cursor only means something for the level it came from.
+        """
+        # Copied out under the lock, the trade loop may append while the dashboard serializes
+        with self.chart.lock:
+            chosen = self.chart_levels.pick(len(self.chart), max_points) if max_points else 0
+            if chosen != level:
+                cursor = 0
+            partial = []
+            if chosen:
+                views, cursor, reset, partial = self.chart_levels.since(chosen, cursor)
+            else:
+                views, cursor, reset = self.chart.since(cursor)
+            points = {name: view.tolist() for name, view in views.items()}
+            window = self.chart_levels.window(chosen) if chosen else self.chart.capacity
+
+        for point in partial:
+            for name, value in zip(FIELDS, point):
+                points[name].append(value)
+        points['level'] = chosen
+        points['partial'] = len(partial)
+        points['window'] = window
+        return points, cursor, reset
+
+    def run_cycle(self, refresh=True):
+        """One pass of the trading loop: balances, price, RSI, resting/stale orders and maybe a trade.
+
+        Returns False when there was no price or RSI to work with, so the caller can retry soon.
+        """
+        ok = False
+        with metrics.cycle_seconds.time(self.display_symbol):
+            try:
+                # Refresh the snapshot once per cycle (max_age=0), everything after reads from it.
+                # The multi-symbol runner fills the snapshot itself and passes refresh=False.
+                max_age = 0 if refresh else None
+                self.update_balances(max_age=max_age)
+                price = self.fetch_current_price(max_age=max_age)
+                rsi = self.calculate_rsi()
+                # After the candle sync, so paper orders get the candle that just closed first
+                if self.paper_trading:
+                    self.match_paper_orders(price)
+                self.check_and_cancel_stale_orders()
+                signal = self.check_signal(price, rsi)
+                if signal:
+                    self.execute_trade(*signal)
+                ok = bool(price) and rsi is not None
+            except Exception as e:
+                logging.error(f"Trade cycle error: {e}")
+        if not ok:
+            metrics.cycle_failures.inc(self.display_symbol)
+        return ok
+
+    def check_signal(self, price, rsi):
+        """Record the chart point and return ('buy'|'sell', amount_to_use) when the RSI says so"""
+        if rsi is not None:
+            self.snapshot.put('rsi', rsi)
+        if not price or rsi is None:
+            return None
+
+        now = time.time()
+        with self.chart.lock:
+            self.chart.append(now, price, rsi)
+            self.chart_levels.append(now, price, rsi)
+
+        logging.info(f"Price: {price:.2f}, RSI: {rsi:.2f}, "
+                     f"USDT: {self.current_usdt_balance:.2f}, "
+                     f"{self.display_symbol}: {self.current_crypto_balance:.8f}")
+
+        if self.trading_enabled:
+            if rsi < self.rsi_low and self.current_usdt_balance >= self.min_usdt_trade:
+                logging.info(f"BUY SIGNAL (RSI {rsi:.2f} < {self.rsi_low})")
+                return 'buy', self.current_usdt_balance
+            if rsi > self.rsi_high and self.current_crypto_balance >= self.min_crypto_trade:
+                logging.info(f"SELL SIGNAL (RSI {rsi:.2f} > {self.rsi_high})")
+                return 'sell', self.current_crypto_balance
+        return None
+
+    def trade_cycle(self):
+        scheduler = CandleScheduler(self.interval, self.candle_grace_seconds, self.order_check_seconds)
+        scheduler.cycle_done(not self.run_cycle())
+        while True:
+            if scheduler.wait() == 'check':
+                self.reconcile_orders()
+                self.check_and_cancel_stale_orders()
+            else:
+                scheduler.cycle_done(not self.run_cycle())
@@ -0,0 +1,90 @@
+"""StreamingPriceFeed against the fake Kraken websocket server, no network needed"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from stub import StubExchange  # noqa: E402
+
+from ssrsi.exchanges import KrakenAdapter  # noqa: E402
+from ssrsi.fakews import FakeKrakenFeed, fake_markets  # noqa: E402
+from ssrsi.feed import StreamingPriceFeed  # noqa: E402
+from ssrsi.trader import RSITrader  # noqa: E402
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def fake_server():
+    """FakeKrakenFeed on an ephemeral port, served from its own event loop thread"""
+    from aiohttp import web
+
+    loop = asyncio.new_event_loop()
+    feed = FakeKrakenFeed(price=5.0, tick_seconds=0.05, seed=1)
+
+    async def serve():
+        runner = web.AppRunner(feed.app())
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return runner, runner.addresses[0][1]
+
+    runner, port = loop.run_until_complete(serve())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield feed, f"ws://127.0.0.1:{port}"
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+@pytest.fixture
+def stream(fake_server):
+    feed, url = fake_server
+    received = []
+    price_feed = StreamingPriceFeed('kraken', 'DOGE/USDT', '5m', max_age=0.5, ws_url=url,
+                                    markets=fake_markets(['DOGE/USDT']), on_candles=received.extend)
+    price_feed.start()
+    yield feed, price_feed, received
+    price_feed.stop()
+
+
+def test_feed_receives_prices_and_candles(stream):
+    feed, price_feed, received = stream
+    assert wait_for(lambda: price_feed.ticks >= 3 and received)
+    assert price_feed.price() == pytest.approx(feed.price, rel=0.05)
+    assert price_feed.candles_fresh()
+    assert all(len(candle) == 6 for candle in received)
+    assert price_feed.errors == 0
+
+
+def test_trader_falls_back_to_rest_when_stream_goes_quiet(stream, tmp_path):
+    feed, price_feed, _ = stream
+    adapter = KrakenAdapter(exchange=StubExchange(candles=50))
+    adapter.log_file = str(tmp_path / 'bot.log')
+    trader = RSITrader(adapter, 'DOGE', paper_trading=True,
+                       settings={'candle_db': ':memory:', 'trade_journal_dir': str(tmp_path / 'trades')})
+    trader.price_feed = price_feed
+    rest_price = adapter.exchange.fetch_ticker('DOGE/USDT')['last']
+
+    assert wait_for(lambda: price_feed.price() is not None)
+    assert trader.fetch_current_price(max_age=0) == price_feed.price()
+
+    # The server stops pushing: once the last tick is older than max_age the trader polls REST again
+    feed.tick_seconds = 3600
+    assert wait_for(lambda: price_feed.price() is None)
+    assert trader.fetch_current_price(max_age=0) == rest_price